@@ -1,7 +1,6 @@
 from flask import Flask
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from dotenv import load_dotenv
 import os
 import logging
 import urllib.parse
@@ -14,27 +13,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file (Vercel injects them directly)
+if not os.getenv('VERCEL'):
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 
-def create_app():
-    """Initialize the core application."""
-    app = Flask(__name__, static_folder='../dist', static_url_path='/')
-    
-    # Configure security settings
-    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', os.urandom(24).hex())
-    app.config['SESSION_COOKIE_SECURE'] = os.getenv('FLASK_ENV') == 'production'
-    app.config['SESSION_COOKIE_HTTPONLY'] = True
-    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
-    app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour
-    
-    # Configure CORS to allow requests from any origin
-    CORS(app, resources={r"/*": {"origins": "*"}})
-    
-    # Configure the database - Use Railway PostgreSQL if available, otherwise SQLite
+INSTANCE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance')
+
+# Built frontend, served by app.services.static_assets
+DIST_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dist')
+
+def get_database_url():
+    """Database URL for this environment: Railway PostgreSQL if configured, otherwise SQLite."""
     database_url = os.getenv('DATABASE_URL')
     
     # If DATABASE_URL is not provided, try to construct it from individual components
@@ -52,18 +45,36 @@ def create_app():
             database_url = f"postgresql://{pg_user}:{encoded_password}@{pg_host}:{pg_port}/{pg_db}"
             logger.info(f"Constructed PostgreSQL URL from environment variables for host: {pg_host}")
     
-    # Configure SQLAlchemy with the database URL
     if database_url:
         # Convert postgres:// to postgresql:// if necessary
         if database_url.startswith('postgres://'):
             database_url = database_url.replace('postgres://', 'postgresql://', 1)
-            
-        app.config['SQLALCHEMY_DATABASE_URI'] = database_url
         logger.info(f"Using PostgreSQL database at {database_url.split('@')[1].split('/')[0] if '@' in database_url else 'unknown host'}")
-    else:
-        # Fallback to SQLite for local development
-        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///contacts.db'
-        logger.info("Using SQLite database")
+        return database_url
+    
+    # Fallback to SQLite for local development, in the Flask instance folder
+    os.makedirs(INSTANCE_PATH, exist_ok=True)
+    logger.info("Using SQLite database")
+    return f"sqlite:///{os.path.join(INSTANCE_PATH, 'contacts.db')}"
+
+def create_app():
+    """Initialize the core application."""
+    # No Flask static route: its /<path:filename> rule would shadow the SPA
+    # fallback, so the static manifest below serves dist/ instead
+    app = Flask(__name__, static_folder=None)
+    
+    # Configure security settings
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', os.urandom(24).hex())
+    app.config['SESSION_COOKIE_SECURE'] = os.getenv('FLASK_ENV') == 'production'
+    app.config['SESSION_COOKIE_HTTPONLY'] = True
+    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+    app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour
+    
+    # Configure CORS to allow requests from any origin
+    CORS(app, resources={r"/*": {"origins": "*"}})
+    
+    # Configure the database - Use Railway PostgreSQL if available, otherwise SQLite
+    app.config['SQLALCHEMY_DATABASE_URI'] = get_database_url()
     
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JSON_SORT_KEYS'] = False
@@ -77,39 +88,78 @@ def create_app():
         
         # Set CORS headers to ensure they aren't overridden
         response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, Idempotency-Key'
         response.headers['Access-Control-Allow-Methods'] = 'GET, OPTIONS, POST, PUT, DELETE'
         
         return response
     
+    # Compress large text responses for clients that accept it
+    from app.middleware.compression import init_compression
+    init_compression(app)
+    
+    # Answer CORS preflights before routing and rate limiting
+    from app.middleware.preflight import init_preflight
+    init_preflight(app)
+    
+    # Pick the connection pool strategy for this deployment
+    from app.services.engine_profile import init_engine_profile, instrument_engine
+    init_engine_profile(app)
+    
     # Initialize plugins
     db.init_app(app)
     
     with app.app_context():
         # Import parts of the application
-        from app.routes import contacts
+        from app.routes import contacts, metrics
         
         # Register blueprints
         app.register_blueprint(contacts.bp)
+        app.register_blueprint(metrics.bp)
+        
+        instrument_engine(db.engine)
         
-        # Create database tables (if they don't exist)
-        db.create_all()
+        # Migrations run out of band (python -m app.migrations) before a
+        # release serves traffic; workers only check the schema version.
+        # The local SQLite fallback migrates itself for convenience.
+        from app import migrations
+        local_sqlite = app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite') and not os.getenv('VERCEL')
+        if os.getenv('DB_SCHEMA_SETUP', 'true' if local_sqlite else 'false').lower() == 'true':
+            migrations.apply_migrations(db.engine)
+        elif not os.getenv('VERCEL'):
+            # Serverless cold starts skip even this round trip
+            migrations.check_schema(db.engine)
+        
+        # Start delivering queued contact notifications
+        from app.services.notification_worker import init_notification_worker
+        init_notification_worker(app)
+        
+        # Catch double-clicks and replayed submissions before they are stored
+        from app.services.dedup import init_submission_dedup
+        init_submission_dedup(app)
+        
+        # Serve repeated single-contact reads from memory
+        from app.services.contact_cache import init_contact_cache
+        init_contact_cache(app)
+        
+        # Optionally batch concurrent contact inserts into shared commits
+        from app.services.group_commit import init_group_committer
+        init_group_committer(app)
         
         # Add a basic API health check route
         @app.route('/api/health')
         def health_check():
             return {'status': 'ok', 'message': 'Thor Signia API is running'}
         
-        # Serve frontend in production
+        # Serve frontend in production from a startup manifest of dist/
+        from app.services.static_assets import init_static_assets
+        static_manifest = init_static_assets(app, DIST_PATH)
+        
         @app.route('/')
         def index():
-            return app.send_static_file('index.html')
+            return static_manifest.serve_index()
         
         @app.route('/<path:path>')
         def catch_all(path):
-            try:
-                return app.send_static_file(path)
-            except:
-                return app.send_static_file('index.html')
+            return static_manifest.serve(path)
                 
         return app 
\ No newline at end of file
@@ -0,0 +1 @@
+"""WSGI middleware that runs ahead of Flask routing."""
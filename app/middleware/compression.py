@@ -0,0 +1,236 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+Contact lists, exports and search results are mostly message text and shrink
+several times over when compressed. Responses are compressed here, around
+the whole app, when:
+
+- the client accepts br (with the brotli package installed) or gzip
+- the body is a text-like type and at least `min_size` bytes; for streams,
+  whose length is unknown, up to `min_size` bytes are buffered to decide
+- it is not already encoded (export ?gzip=true, precompressed static files)
+  and does not carry Cache-Control: no-transform
+
+Bodies of known length are compressed in one piece and keep a Content-Length;
+streams are compressed chunk by chunk as they are produced. ETags of
+compressed responses are made weak, as their bytes differ from the identity
+body's. Everything else, including small bodies like /api/health, is passed
+through untouched.
+"""
+
+import itertools
+import os
+import threading
+import zlib
+from functools import lru_cache
+
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml'
+)
+
+# Status codes that never carry a body worth compressing
+BODYLESS_STATUSES = ('204', '206', '304')
+
+def gzip_compressor(level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+    return compressor.compress, compressor.flush
+
+def brotli_compressor(quality):
+    compressor = brotli.Compressor(quality=quality)
+    return compressor.process, compressor.finish
+
+# Preferred first when the client accepts several with the same quality
+COMPRESSORS = {'br': brotli_compressor, 'gzip': gzip_compressor} if brotli is not None else {'gzip': gzip_compressor}
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding, encodings):
+    """The best of `encodings` for an Accept-Encoding header, or None."""
+    if not accept_encoding:
+        return None
+    accepted = parse_accept_header(accept_encoding)
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accepted[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compressible(content_type):
+    mimetype = content_type.split(';', 1)[0].strip().lower()
+    return mimetype.startswith(COMPRESSIBLE_TYPES) or mimetype.endswith(('+json', '+xml'))
+
+class CompressionMiddleware:
+    """Compress eligible responses with the best encoding the client accepts."""
+
+    def __init__(self, app, min_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.min_size = min_size
+        self.levels = {'gzip': gzip_level, 'br': brotli_quality}
+        self.encodings = tuple(COMPRESSORS)
+
+        self._lock = threading.Lock()
+        self.compressed = dict.fromkeys(self.encodings, 0)
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.app(environ, start_response)
+        encoding = negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''), self.encodings)
+
+        # Compression is decided when the app starts its response; if it does,
+        # the real start_response waits until the body has been looked at
+        deferred = {}
+        pending = []
+        returned = False
+
+        def capture(status, headers, exc_info=None):
+            if exc_info is None and not returned:
+                length = self._eligible_length(status, headers)
+                if length is not False:
+                    headers = add_vary(headers)
+                    if encoding is not None and (length is None or length >= self.min_size):
+                        deferred.update(status=status, headers=headers, length=length)
+                        return pending.append
+            deferred.clear()
+            return start_response(status, headers, exc_info)
+
+        body = self.app(environ, capture)
+        returned = True
+        if not deferred:
+            return body
+        return self._compress(body, pending, encoding, start_response, **deferred)
+
+    def _eligible_length(self, status, headers):
+        """False if the response must pass through, else its Content-Length (None if streamed)."""
+        if status[:3] in BODYLESS_STATUSES:
+            return False
+        content_type = length = None
+        for name, value in headers:
+            name = name.lower()
+            if name == 'content-encoding':
+                return False
+            if name == 'cache-control' and 'no-transform' in value.lower():
+                return False
+            if name == 'content-type':
+                content_type = value
+            elif name == 'content-length':
+                length = int(value)
+        if content_type is None or not compressible(content_type):
+            return False
+        if length is not None and length < self.min_size:
+            return False
+        return length
+
+    def _compress(self, body, pending, encoding, start_response, status, headers, length):
+        try:
+            chunks = itertools.chain(pending, body)
+            buffered, size = [], 0
+            if length is None:
+                for chunk in chunks:
+                    buffered.append(chunk)
+                    size += len(chunk)
+                    if size >= self.min_size:
+                        break
+                else:
+                    # A short stream: send it as it is
+                    data = b''.join(buffered)
+                    start_response(status, headers + [('Content-Length', str(len(data)))])
+                    yield data
+                    return
+
+            compress, finish = COMPRESSORS[encoding](self.levels[encoding])
+            headers = encoded_headers(headers, encoding)
+            if length is not None:
+                data = b''.join(chunks)
+                compressed = compress(data) + finish()
+                self._record(encoding, len(data), len(compressed))
+                start_response(status, headers + [('Content-Length', str(len(compressed)))])
+                yield compressed
+                return
+
+            start_response(status, headers)
+            compressed_size = 0
+            out = compress(b''.join(buffered))
+            if out:
+                compressed_size += len(out)
+                yield out
+            for chunk in chunks:
+                size += len(chunk)
+                out = compress(chunk)
+                if out:
+                    compressed_size += len(out)
+                    yield out
+            out = finish()
+            self._record(encoding, size, compressed_size + len(out))
+            yield out
+        finally:
+            close = getattr(body, 'close', None)
+            if close is not None:
+                close()
+
+    def _record(self, encoding, size, compressed_size):
+        with self._lock:
+            self.compressed[encoding] += 1
+            self.bytes_in += size
+            self.bytes_out += compressed_size
+
+    def stats(self):
+        """Counters for /api/metrics."""
+        with self._lock:
+            return {
+                'min_size': self.min_size,
+                'levels': {encoding: self.levels[encoding] for encoding in self.encodings},
+                'compressed': dict(self.compressed),
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else None,
+            }
+
+def add_vary(headers):
+    """`headers` with Accept-Encoding added to Vary."""
+    headers = list(headers)
+    for i, (name, value) in enumerate(headers):
+        if name.lower() == 'vary':
+            if value.strip() == '*' or 'accept-encoding' in value.lower():
+                return headers
+            headers[i] = (name, f'{value}, Accept-Encoding')
+            return headers
+    headers.append(('Vary', 'Accept-Encoding'))
+    return headers
+
+def encoded_headers(headers, encoding):
+    """`headers` for the compressed body: no Content-Length, weak ETag, Content-Encoding set."""
+    result = []
+    for name, value in headers:
+        lowered = name.lower()
+        if lowered == 'content-length':
+            continue
+        if lowered == 'etag' and not value.startswith('W/'):
+            value = f'W/{value}'
+        result.append((name, value))
+    result.append(('Content-Encoding', encoding))
+    return result
+
+def init_compression(app):
+    """Wrap the app's WSGI stack in response compression unless COMPRESSION_ENABLED=false."""
+    if os.getenv('COMPRESSION_ENABLED', 'true').lower() != 'true':
+        return None
+
+    middleware = CompressionMiddleware(
+        app.wsgi_app,
+        min_size=int(os.getenv('COMPRESSION_MIN_SIZE', 1024)),
+        gzip_level=int(os.getenv('COMPRESSION_GZIP_LEVEL', 6)),
+        brotli_quality=int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+    )
+    app.wsgi_app = middleware
+    app.extensions['compression'] = middleware
+    return middleware
@@ -0,0 +1,45 @@
+"""
+CORS preflight short-circuit.
+
+Browsers send an OPTIONS preflight before every cross-origin JSON POST. These
+carry no payload and always get the same answer, so they are answered here from
+a precomputed header set, before Flask routing, the rate limiter or any
+after_request hooks run. Access-Control-Max-Age lets browsers cache the answer.
+"""
+
+import os
+
+DEFAULT_ALLOW_METHODS = 'GET, POST, PUT, DELETE, OPTIONS'
+DEFAULT_ALLOW_HEADERS = 'Content-Type, Authorization, Accept, X-Requested-With, Idempotency-Key'
+
+class PreflightMiddleware:
+    """Answer CORS preflight requests for API paths without entering the app."""
+
+    def __init__(self, app, path_prefix='/api/', allow_origin='*',
+                 allow_methods=DEFAULT_ALLOW_METHODS, allow_headers=DEFAULT_ALLOW_HEADERS,
+                 max_age=86400):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.headers = [
+            ('Access-Control-Allow-Origin', allow_origin),
+            ('Access-Control-Allow-Methods', allow_methods),
+            ('Access-Control-Allow-Headers', allow_headers),
+            ('Access-Control-Max-Age', str(max_age)),
+            ('X-Content-Type-Options', 'nosniff'),
+            ('Content-Length', '0'),
+        ]
+
+    def __call__(self, environ, start_response):
+        if (environ.get('REQUEST_METHOD') == 'OPTIONS'
+                and 'HTTP_ACCESS_CONTROL_REQUEST_METHOD' in environ
+                and (environ.get('PATH_INFO', '') + '/').startswith(self.path_prefix)):
+            start_response('204 No Content', self.headers)
+            return []
+        return self.app(environ, start_response)
+
+def init_preflight(app):
+    """Install the preflight handler in front of the app's WSGI stack."""
+    app.wsgi_app = PreflightMiddleware(
+        app.wsgi_app,
+        max_age=int(os.getenv('CORS_MAX_AGE', 86400))
+    )
@@ -0,0 +1,126 @@
+"""
+Versioned schema migrations.
+
+Each migration is a module in this package named `vNNNN_<description>.py`
+that defines `upgrade(connection)`. Applied versions are recorded in the
+`schema_version` table, so every migration runs exactly once per database.
+Migrations should be idempotent (e.g. `CREATE INDEX IF NOT EXISTS`) so they
+also apply cleanly to databases whose tables predate them.
+
+Migrations run out of band, before a release starts serving:
+
+    python -m app.migrations            # apply pending migrations
+    python -m app.migrations status     # show applied and pending versions
+
+Web workers only compare the recorded versions with the ones they ship
+(`check_schema`), a single query.
+"""
+
+import importlib
+import logging
+import pkgutil
+import re
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, select, text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+MODULE_PATTERN = re.compile(r'^v(\d{4})_\w+$')
+
+# Arbitrary constant key for the Postgres advisory lock serializing runners
+ADVISORY_LOCK_KEY = 7_420_118
+
+metadata = MetaData()
+
+schema_version = Table(
+    'schema_version', metadata,
+    Column('version', Integer, primary_key=True),
+    Column('description', String(200), nullable=False),
+    Column('applied_at', DateTime, nullable=False, default=datetime.utcnow),
+)
+
+def migration_names():
+    """All migration module names as (version, name), in version order."""
+    names = []
+    for info in pkgutil.iter_modules(__path__):
+        match = MODULE_PATTERN.match(info.name)
+        if match:
+            names.append((int(match.group(1)), info.name))
+    return sorted(names)
+
+def load_migrations():
+    """All migration modules as (version, name, module), in version order."""
+    return [
+        (version, name, importlib.import_module(f'{__name__}.{name}'))
+        for version, name in migration_names()
+    ]
+
+def _lock(connection):
+    # Workers booting together must not apply the same migration twice
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SELECT pg_advisory_xact_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+
+def applied_versions(connection):
+    """Versions already recorded in schema_version."""
+    return set(connection.execute(select(schema_version.c.version)).scalars())
+
+def apply_migrations(engine):
+    """Apply every pending migration, each in its own transaction.
+
+    Returns the versions applied by this call.
+    """
+    with engine.begin() as connection:
+        _lock(connection)
+        metadata.create_all(connection, checkfirst=True)
+
+    applied = []
+    for version, name, module in load_migrations():
+        try:
+            with engine.begin() as connection:
+                _lock(connection)
+                if version in applied_versions(connection):
+                    continue
+                logger.info(f"Applying migration {name}")
+                module.upgrade(connection)
+                connection.execute(schema_version.insert().values(
+                    version=version,
+                    description=name.split('_', 1)[1].replace('_', ' ')
+                ))
+            applied.append(version)
+        except IntegrityError:
+            # Another process recorded the same version first
+            logger.info(f"Migration {name} was applied concurrently")
+    return applied
+
+def pending_versions(engine):
+    """Shipped migration versions not yet recorded in the database."""
+    try:
+        with engine.connect() as connection:
+            applied = applied_versions(connection)
+    except SQLAlchemyError:
+        # No schema_version table yet, or the database is unreachable
+        applied = set()
+    return [version for version, _ in migration_names() if version not in applied]
+
+def check_schema(engine):
+    """Warn when the database is behind the migrations this code ships.
+
+    Returns True when the schema is up to date.
+    """
+    pending = pending_versions(engine)
+    if pending:
+        logger.warning(f"Database schema is missing migrations {pending}; run `python -m app.migrations`")
+        return False
+    return True
+
+def upgrade(database_url):
+    """Apply pending migrations to the database at `database_url`."""
+    engine = create_engine(database_url)
+    try:
+        applied = apply_migrations(engine)
+    finally:
+        engine.dispose()
+    logger.info(f"Applied migrations {applied}" if applied else "Database schema is up to date")
+    return applied
@@ -0,0 +1,39 @@
+"""
+Command line entry point for schema migrations.
+
+Usage:
+    python -m app.migrations [upgrade|status] [--database-url URL]
+"""
+
+import argparse
+import sys
+
+from sqlalchemy import create_engine
+
+from app import get_database_url
+from app.migrations import migration_names, pending_versions, upgrade
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply or inspect versioned schema migrations')
+    parser.add_argument('command', nargs='?', choices=['upgrade', 'status'], default='upgrade')
+    parser.add_argument('--database-url', help='Database URL (defaults to the app configuration)')
+    args = parser.parse_args()
+
+    database_url = args.database_url or get_database_url()
+
+    if args.command == 'upgrade':
+        upgrade(database_url)
+        return
+
+    engine = create_engine(database_url)
+    try:
+        pending = set(pending_versions(engine))
+    finally:
+        engine.dispose()
+    for version, name in migration_names():
+        print(f"{'pending' if version in pending else 'applied':8} {name}")
+    # Non-zero exit lets deploy checks fail on a stale schema
+    sys.exit(1 if pending else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Baseline schema: the contact and notification_outbox tables.
+
+The tables are frozen here as they were first released rather than taken from
+the models, so later model changes need a migration of their own. Databases
+that predate versioned migrations already have them; creation is skipped for
+tables that exist.
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, Text
+
+metadata = MetaData()
+
+Table(
+    'contact', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('email', String(120), nullable=False),
+    Column('phone', String(20), nullable=True),
+    Column('company', String(100), nullable=False),
+    Column('message', Text, nullable=False),
+    Column('created_at', DateTime),
+)
+
+Table(
+    'notification_outbox', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('contact_id', Integer, ForeignKey('contact.id'), nullable=True),
+    Column('payload', Text, nullable=False),
+    Column('status', String(20), nullable=False),
+    Column('attempts', Integer, nullable=False),
+    Column('next_attempt_at', DateTime, nullable=False),
+    Column('last_error', Text, nullable=True),
+    Column('created_at', DateTime),
+    Column('sent_at', DateTime, nullable=True),
+    Index('ix_notification_outbox_status_due', 'status', 'next_attempt_at'),
+)
+
+def upgrade(connection):
+    metadata.create_all(connection, checkfirst=True)
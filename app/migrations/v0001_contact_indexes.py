@@ -0,0 +1,19 @@
+"""
+Secondary indexes on the contact table.
+
+- (created_at, id) serves newest-first listings and keyset pages without a sort
+- lower(email) serves case-insensitive lookups by email
+- (company, created_at) serves per-company listings in date order
+"""
+
+from sqlalchemy import text
+
+STATEMENTS = (
+    'CREATE INDEX IF NOT EXISTS ix_contact_created_at ON contact (created_at, id)',
+    'CREATE INDEX IF NOT EXISTS ix_contact_email_lower ON contact (lower(email))',
+    'CREATE INDEX IF NOT EXISTS ix_contact_company_created_at ON contact (company, created_at)',
+)
+
+def upgrade(connection):
+    for statement in STATEMENTS:
+        connection.execute(text(statement))
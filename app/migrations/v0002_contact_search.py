@@ -0,0 +1,69 @@
+"""
+Full-text search over contacts.
+
+- SQLite: an external-content FTS5 table, contact_search, kept in step with
+  contact by triggers and built from the existing rows once
+- PostgreSQL: a stored generated tsvector column, contact.search_vector, with
+  a GIN index; the database keeps it current on every insert and update
+
+Both index name, email, company and message (see ContactService.search).
+"""
+
+from sqlalchemy import text
+
+SQLITE_STATEMENTS = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS contact_search USING fts5(
+        name, email, company, message,
+        content='contact', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contact_search_insert AFTER INSERT ON contact BEGIN
+        INSERT INTO contact_search (rowid, name, email, company, message)
+        VALUES (new.id, new.name, new.email, new.company, new.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contact_search_delete AFTER DELETE ON contact BEGIN
+        INSERT INTO contact_search (contact_search, rowid, name, email, company, message)
+        VALUES ('delete', old.id, old.name, old.email, old.company, old.message);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contact_search_update AFTER UPDATE ON contact BEGIN
+        INSERT INTO contact_search (contact_search, rowid, name, email, company, message)
+        VALUES ('delete', old.id, old.name, old.email, old.company, old.message);
+        INSERT INTO contact_search (rowid, name, email, company, message)
+        VALUES (new.id, new.name, new.email, new.company, new.message);
+    END
+    """,
+    # bm25 weights per column, in line with the PostgreSQL setweight classes
+    "INSERT INTO contact_search (contact_search, rank) VALUES ('rank', 'bm25(10.0, 5.0, 10.0, 1.0)')",
+    # Index the rows that predate the triggers
+    "INSERT INTO contact_search (contact_search) VALUES ('rebuild')",
+)
+
+POSTGRES_STATEMENTS = (
+    """
+    ALTER TABLE contact ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '') || ' ' || coalesce(company, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(email, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(message, '')), 'C')
+    ) STORED
+    """,
+    'CREATE INDEX IF NOT EXISTS ix_contact_search_vector ON contact USING GIN (search_vector)',
+)
+
+def upgrade(connection):
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        statements = SQLITE_STATEMENTS
+    elif dialect == 'postgresql':
+        statements = POSTGRES_STATEMENTS
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+    for statement in statements:
+        connection.execute(text(statement))
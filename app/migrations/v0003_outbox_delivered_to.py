@@ -0,0 +1,14 @@
+"""
+Per-recipient delivery state for notification digests.
+
+notification_outbox.delivered_to holds a JSON list of the EMAIL_TO recipients
+that already accepted an entry, so a retry after a partial failure only goes
+to the recipients that missed it.
+"""
+
+from sqlalchemy import inspect, text
+
+def upgrade(connection):
+    columns = {column['name'] for column in inspect(connection).get_columns('notification_outbox')}
+    if 'delivered_to' not in columns:
+        connection.execute(text('ALTER TABLE notification_outbox ADD COLUMN delivered_to TEXT'))
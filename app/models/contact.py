@@ -1,7 +1,6 @@
-from app import db
+from app import db, validation
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime
-import re
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, func
 
 class Contact(db.Model):
     """Contact form submission model."""
@@ -16,7 +15,26 @@ class Contact(db.Model):
     message = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    def __init__(self, name, email, phone, company, message):
+    # Kept in step with app/migrations, which adds them to existing databases.
+    # The full-text search index is dialect-specific and only exists there
+    # (v0002_contact_search).
+    __table_args__ = (
+        # (created_at, id) also covers the newest-first keyset order
+        Index('ix_contact_created_at', 'created_at', 'id'),
+        Index('ix_contact_email_lower', func.lower(email)),
+        Index('ix_contact_company_created_at', 'company', 'created_at'),
+    )
+    
+    def __init__(self, name, email, phone, company, message, trusted=False):
+        if trusted:
+            # Values from app.validation.normalize_contact are already clean
+            self.name = name
+            self.email = email
+            self.phone = phone
+            self.company = company
+            self.message = message
+            return
+        
         self.name = self.validate_name(name)
         self.email = self.validate_email(email)
         self.phone = self.validate_phone(phone)
@@ -26,89 +44,27 @@ class Contact(db.Model):
     @staticmethod
     def validate_name(name):
         """Validate and sanitize name"""
-        if not name or not isinstance(name, str):
-            raise ValueError("Name is required and must be a string")
-        
-        # Trim and limit length
-        name = name.strip()[:100]
-        
-        # Basic sanitization
-        name = re.sub(r'[<>\'";]', '', name)
-        
-        if not name:
-            raise ValueError("Name cannot be empty after sanitization")
-            
-        return name
+        return validation.clean_text(name, 'name', 'Name')
     
     @staticmethod
     def validate_email(email):
         """Validate email format"""
-        if not email or not isinstance(email, str):
-            raise ValueError("Email is required and must be a string")
-            
-        # Trim and limit length
-        email = email.strip()[:120]
-        
-        # Basic sanitization
-        email = re.sub(r'[<>\'";]', '', email)
-        
-        # Email format validation
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(email_pattern, email):
-            raise ValueError("Invalid email format")
-            
-        return email
+        return validation.clean_email(email)
     
     @staticmethod
     def validate_phone(phone):
         """Validate phone number"""
-        if not phone:
-            return None
-            
-        if not isinstance(phone, str):
-            raise ValueError("Phone must be a string")
-            
-        # Trim and limit length  
-        phone = phone.strip()[:20]
-        
-        # Allow only digits, spaces, +, -, and parentheses
-        phone = re.sub(r'[^\d\s\+\-\(\)]', '', phone)
-            
-        return phone
+        return validation.clean_phone(phone)
     
     @staticmethod
     def validate_company(company):
         """Validate and sanitize company"""
-        if not company or not isinstance(company, str):
-            raise ValueError("Company is required and must be a string")
-            
-        # Trim and limit length
-        company = company.strip()[:100]
-        
-        # Basic sanitization
-        company = re.sub(r'[<>\'";]', '', company)
-        
-        if not company:
-            raise ValueError("Company cannot be empty after sanitization")
-            
-        return company
+        return validation.clean_text(company, 'company', 'Company')
     
     @staticmethod
     def validate_message(message):
         """Validate and sanitize message"""
-        if not message or not isinstance(message, str):
-            raise ValueError("Message is required and must be a string")
-            
-        # Trim and limit length (maximum 2000 characters)
-        message = message.strip()[:2000]
-        
-        # Basic sanitization
-        message = re.sub(r'[<>\'";]', '', message)
-        
-        if not message:
-            raise ValueError("Message cannot be empty after sanitization")
-            
-        return message
+        return validation.clean_text(message, 'message', 'Message')
     
     def __repr__(self):
         return f'<Contact {self.name} - {self.email}>'
@@ -0,0 +1,54 @@
+from app import db
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+import json
+
+class NotificationOutbox(db.Model):
+    """Pending email notification written in the same transaction as its contact."""
+
+    __tablename__ = 'notification_outbox'
+    __table_args__ = (
+        Index('ix_notification_outbox_status_due', 'status', 'next_attempt_at'),
+    )
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_SKIPPED = 'skipped'
+    STATUS_FAILED = 'failed'
+
+    id = Column(Integer, primary_key=True)
+    contact_id = Column(Integer, ForeignKey('contact.id'), nullable=True)
+    payload = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default=STATUS_PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    # JSON list of the recipients that already accepted this entry (digests)
+    delivered_to = Column(Text, nullable=True)
+
+    def __init__(self, payload, contact_id=None):
+        self.contact_id = contact_id
+        self.payload = json.dumps(payload)
+        self.status = self.STATUS_PENDING
+        self.attempts = 0
+        self.next_attempt_at = datetime.utcnow()
+
+    def __repr__(self):
+        return f'<NotificationOutbox {self.id} - {self.status}>'
+
+    def get_payload(self):
+        """Decode the stored notification payload."""
+        return json.loads(self.payload)
+
+    def get_delivered_to(self):
+        """Recipients that already accepted this notification."""
+        return json.loads(self.delivered_to) if self.delivered_to else []
+
+    def add_delivered_to(self, recipients):
+        """Record more recipients as having accepted this notification."""
+        delivered = self.get_delivered_to()
+        delivered.extend(recipient for recipient in recipients if recipient not in delivered)
+        self.delivered_to = json.dumps(delivered)
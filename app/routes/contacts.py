@@ -1,50 +1,30 @@
-from flask import Blueprint, jsonify, request, current_app, make_response
+from flask import Blueprint, Response, jsonify, request, current_app, stream_with_context
 from app import db
 from app.models.contact import Contact
+from app.services.auth import bearer_authorized
+from app.services.contact_service import EXPORT_COLUMNS, ContactService, InvalidCursor
 from app.services.email_service import EmailService
+from app.services.idempotency import idempotent
+from app.services.notification_worker import dispatch_notifications
+from app.services.rate_limiter import rate_limit
+from app.validation import normalize_contact, normalize_contacts
+import csv
+import io
+import json
 import logging
 import os
-import re
-import time
-from functools import wraps
+import zlib
 from datetime import datetime, timedelta
 
 bp = Blueprint('contacts', __name__, url_prefix='/api/contacts')
 logger = logging.getLogger(__name__)
 
-# Simple in-memory rate limiting store
-# In production, this should use Redis or similar
-ip_request_count = {}
-ip_request_timestamp = {}
-MAX_REQUESTS = 5  # Maximum 5 requests
-RATE_LIMIT_WINDOW = 60  # per minute (60 seconds)
-
-def rate_limit(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        # Get client IP
-        ip = request.remote_addr
-        current_time = time.time()
-        
-        # Initialize if IP not seen before
-        if ip not in ip_request_count:
-            ip_request_count[ip] = 0
-            ip_request_timestamp[ip] = current_time
-        
-        # Reset counter if window has passed
-        if current_time - ip_request_timestamp[ip] > RATE_LIMIT_WINDOW:
-            ip_request_count[ip] = 0
-            ip_request_timestamp[ip] = current_time
-        
-        # Increment counter
-        ip_request_count[ip] += 1
-        
-        # Check if rate limit exceeded
-        if ip_request_count[ip] > MAX_REQUESTS:
-            return jsonify({"error": "Rate limit exceeded. Please try again later."}), 429
-        
-        return f(*args, **kwargs)
-    return decorated_function
+MAX_BATCH_SIZE = int(os.getenv('CONTACT_BATCH_MAX_SIZE', 500))
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+MAX_SEARCH_LENGTH = 200
 
 def add_security_headers(response):
     """Add security headers to response"""
@@ -60,101 +40,88 @@ def secure_headers(response):
     """Add security headers to all responses"""
     return add_security_headers(response)
 
-def validate_email(email):
-    """Validate email format"""
-    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(email_pattern, email) is not None
+def duplicate_response(kind, match):
+    """Answer a repeated submission without storing or emailing it again.
 
-def sanitize_input(text):
-    """Basic input sanitization"""
-    if not text:
-        return ""
-    # Remove potentially dangerous characters
-    return re.sub(r'[<>\'";]', '', text)
+    An exact repeat of a stored submission gets 200 with the original id; a
+    near-duplicate, or a repeat of one still being stored, gets 409.
+    """
+    if kind == 'exact' and match.contact_id is not None:
+        response = jsonify({
+            'id': match.contact_id,
+            'message': 'Contact already received',
+            'duplicate': True,
+            'emailSent': False,
+            'emailQueued': False,
+            'backupCreated': False
+        })
+        status = 200
+    else:
+        response = jsonify({
+            'error': 'Duplicate submission',
+            'id': match.contact_id,
+            'duplicate': True
+        })
+        status = 409
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    return response, status
 
-@bp.route('', methods=['POST', 'OPTIONS'])
+@bp.route('', methods=['POST'])
+@idempotent
 @rate_limit
 def create_contact():
     """Create a new contact submission."""
-    # Handle preflight CORS requests
-    if request.method == 'OPTIONS':
-        response = make_response()
-        response.headers.add('Access-Control-Allow-Origin', '*')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
-        response.headers.add('Access-Control-Allow-Methods', 'POST')
-        return response
-        
     try:
         # Get form data
         data = request.get_json()
         if not data:
             return jsonify({"error": "Invalid JSON data"}), 400
         
-        # Validate required fields
-        required_fields = ['name', 'email', 'company', 'message']
-        for field in required_fields:
-            if not data.get(field):
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        # Validate email format
-        if not validate_email(data.get('email', '')):
-            return jsonify({"error": "Invalid email format"}), 400
-        
-        # Sanitize inputs
-        sanitized_data = {
-            'name': sanitize_input(data['name']),
-            'email': sanitize_input(data['email']),
-            'phone': sanitize_input(data.get('phone', '')),
-            'company': sanitize_input(data['company']),
-            'message': sanitize_input(data['message'])
-        }
-        
-        # Validate data lengths
-        if len(sanitized_data['name']) > 100:
-            return jsonify({"error": "Name is too long (max 100 characters)"}), 400
-        if len(sanitized_data['email']) > 120:
-            return jsonify({"error": "Email is too long (max 120 characters)"}), 400
-        if len(sanitized_data['phone']) > 20:
-            return jsonify({"error": "Phone number is too long (max 20 characters)"}), 400
-        if len(sanitized_data['company']) > 100:
-            return jsonify({"error": "Company name is too long (max 100 characters)"}), 400
-        if len(sanitized_data['message']) > 2000:
-            return jsonify({"error": "Message is too long (max 2000 characters)"}), 400
-        
-        # Create new contact
-        new_contact = Contact(
-            name=sanitized_data['name'],
-            email=sanitized_data['email'],
-            phone=sanitized_data['phone'],
-            company=sanitized_data['company'],
-            message=sanitized_data['message']
-        )
-        
-        # Save to database
-        db.session.add(new_contact)
-        db.session.commit()
+        # Validate and normalize the submission in one pass
+        sanitized_data, error = normalize_contact(data)
+        if error:
+            return jsonify({"error": error}), 400
         
-        # Prepare contact data for email
-        contact_data = {
-            'name': sanitized_data['name'],
-            'email': sanitized_data['email'],
-            'phone': sanitized_data['phone'],
-            'company': sanitized_data['company'],
-            'message': sanitized_data['message'],
-            'timestamp': new_contact.created_at.isoformat() if new_contact.created_at else None
-        }
+        # Repeats of a recent submission skip the database and the email
+        dedup = current_app.extensions.get('submission_dedup')
+        claim = None
+        if dedup is not None:
+            kind, claim = dedup.claim(sanitized_data)
+            if kind is not None:
+                return duplicate_response(kind, claim)
         
-        # Send email notification - don't block on this
-        email_result = EmailService.send_contact_notification(contact_data)
+        try:
+            committer = current_app.extensions.get('group_committer')
+            if committer is not None:
+                # Share one transaction with concurrent submissions
+                contact_id, created_at = committer.submit(sanitized_data)
+            else:
+                # INSERT ... RETURNING hands back id and created_at, so nothing
+                # has to be re-read after the commit
+                [(contact_id, created_at)] = ContactService.insert_many([sanitized_data])
+                db.session.commit()
+        except Exception:
+            if claim is not None:
+                dedup.release(claim)
+            raise
+        if claim is not None:
+            dedup.complete(claim, contact_id)
+        
+        # Prepare contact data for email and backup
+        contact_data = ContactService.notification_payload(sanitized_data, created_at)
+        
+        # Email is sent by the notification worker - don't block on SMTP
+        email_queued = dispatch_notifications()
         
         # Backup the submission - don't block on this
         backup_result = EmailService.backup_submission(contact_data)
         
         # Create response with proper CORS headers
         response = jsonify({
-            'id': new_contact.id,
+            'id': contact_id,
             'message': 'Contact saved successfully',
-            'emailSent': email_result.get('success', False),
+            'emailSent': False,
+            'emailQueued': email_queued,
             'backupCreated': backup_result.get('success', False)
         })
         response.headers.add('Access-Control-Allow-Origin', '*')
@@ -169,18 +136,126 @@ def create_contact():
         response.headers.add('Access-Control-Allow-Origin', '*')
         return response, 500
 
+@bp.route('/batch', methods=['POST'])
+@idempotent
+@rate_limit
+def create_contacts_batch():
+    """Create many contact submissions with a single multi-row insert.
+
+    Accepts a JSON array of contacts (or {"contacts": [...]}) and reports the
+    outcome per row. Pass ?notify=false to store rows without queuing emails.
+    In production the endpoint needs BATCH_TOKEN.
+    """
+    try:
+        if not bearer_authorized('BATCH_TOKEN'):
+            return jsonify({"error": "Access restricted in production"}), 403
+        
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get('contacts')
+        if not isinstance(data, list) or not data:
+            return jsonify({"error": "Expected a non-empty JSON array of contacts"}), 400
+        if len(data) > MAX_BATCH_SIZE:
+            return jsonify({"error": f"Too many contacts in batch (max {MAX_BATCH_SIZE})"}), 413
+        
+        notify = request.args.get('notify', 'true').lower() != 'false'
+        
+        # Validate every row in one pass before touching the database
+        results = [None] * len(data)
+        valid_rows = []
+        valid_indexes = []
+        for index, (values, error) in enumerate(normalize_contacts(data)):
+            if error:
+                results[index] = {'index': index, 'status': 'error', 'error': error}
+            else:
+                valid_rows.append(values)
+                valid_indexes.append(index)
+        
+        inserted = ContactService.insert_many(valid_rows, notify=notify)
+        db.session.commit()
+        
+        if notify and inserted:
+            dispatch_notifications(len(inserted))
+        
+        for index, values, (contact_id, created_at) in zip(valid_indexes, valid_rows, inserted):
+            results[index] = {'index': index, 'status': 'created', 'id': contact_id}
+            EmailService.backup_submission(ContactService.notification_payload(values, created_at))
+        
+        created = len(inserted)
+        failed = len(data) - created
+        if not created:
+            status = 400
+        elif failed:
+            status = 207
+        else:
+            status = 201
+        
+        response = jsonify({
+            'created': created,
+            'failed': failed,
+            'results': results
+        })
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response, status
+        
+    except Exception as e:
+        logger.exception("Error processing contact batch")
+        db.session.rollback()
+        
+        # Return error with proper CORS headers
+        response = jsonify({"error": "Failed to save contacts"})
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response, 500
+
+def stream_json_array(items, chunk_size=100):
+    """Yield a JSON array in chunks so large results never sit in memory."""
+    yield '['
+    chunk = []
+    first = True
+    for item in items:
+        chunk.append(json.dumps(item))
+        if len(chunk) >= chunk_size:
+            yield ('' if first else ',') + ','.join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield ('' if first else ',') + ','.join(chunk)
+    yield ']'
+
 @bp.route('', methods=['GET'])
 def get_contacts():
-    """Get all contacts (development environment only)."""
+    """Get contacts newest first (development environment only).
+
+    With `limit` and/or `cursor`, returns one keyset page:
+    {"items": [...], "next_cursor": "..."}. Without them, streams every
+    contact as a JSON array using constant memory.
+    """
     try:
         # In production, don't allow listing all contacts
         if os.getenv('FLASK_ENV') == 'production':
             return jsonify({"error": "Access restricted in production"}), 403
         
-        contacts = Contact.query.order_by(Contact.created_at.desc()).all()
+        if 'limit' in request.args or 'cursor' in request.args:
+            limit = (request.args.get('limit', type=int) if 'limit' in request.args else DEFAULT_PAGE_SIZE)
+            if limit is None or limit < 1:
+                return jsonify({"error": "limit must be a positive integer"}), 400
+            limit = min(limit, MAX_PAGE_SIZE)
+            
+            try:
+                contacts, next_cursor = ContactService.page(limit, request.args.get('cursor'))
+            except InvalidCursor:
+                return jsonify({"error": "Invalid cursor"}), 400
+            
+            response = jsonify({
+                'items': [contact.to_dict() for contact in contacts],
+                'next_cursor': next_cursor
+            })
+        else:
+            contacts = (contact.to_dict() for contact in ContactService.iter_all())
+            response = Response(stream_with_context(stream_json_array(contacts)),
+                                mimetype='application/json')
         
         # Return with proper CORS headers
-        response = jsonify([contact.to_dict() for contact in contacts])
         response.headers.add('Access-Control-Allow-Origin', '*')
         return response
         
@@ -192,25 +267,164 @@ def get_contacts():
         response.headers.add('Access-Control-Allow-Origin', '*')
         return response, 500
 
+def export_rows_as_ndjson(rows):
+    for row in rows:
+        record = row._asdict()
+        record['created_at'] = record['created_at'].isoformat() if record['created_at'] else None
+        yield json.dumps(record) + '\n'
+
+def export_rows_as_csv(rows, chunk_size=500):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, row in enumerate(rows, 1):
+        *fields, created_at = row
+        writer.writerow(fields + [created_at.isoformat() if created_at else ''])
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def gzip_stream(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+@bp.route('/export', methods=['GET'])
+def export_contacts():
+    """Stream contacts as NDJSON or CSV for incremental CRM pulls.
+
+    Query parameters: format=ndjson|csv, since=<ISO timestamp> (rows created
+    at or after it), gzip=true to compress the stream.
+    """
+    try:
+        if not bearer_authorized('EXPORT_TOKEN'):
+            return jsonify({"error": "Access restricted in production"}), 403
+        
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in ('ndjson', 'csv'):
+            return jsonify({"error": "format must be ndjson or csv"}), 400
+        
+        since = request.args.get('since')
+        if since:
+            try:
+                since = datetime.fromisoformat(since)
+            except ValueError:
+                return jsonify({"error": "since must be an ISO 8601 timestamp"}), 400
+        
+        rows = ContactService.iter_export_rows(since=since or None)
+        if export_format == 'csv':
+            body = export_rows_as_csv(rows)
+            mimetype = 'text/csv'
+        else:
+            body = export_rows_as_ndjson(rows)
+            mimetype = 'application/x-ndjson'
+        
+        filename = f"contacts-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.{export_format}"
+        compress = request.args.get('gzip', 'false').lower() in ('1', 'true')
+        if compress:
+            body = gzip_stream(body)
+        
+        response = Response(stream_with_context(body), mimetype=mimetype)
+        if compress:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+        
+    except Exception as e:
+        logger.exception("Error exporting contacts")
+        
+        # Return error with proper CORS headers
+        response = jsonify({"error": "Failed to export contacts"})
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response, 500
+
+@bp.route('/search', methods=['GET'])
+def search_contacts():
+    """Full-text search over name, email, company and message.
+
+    Query parameters: q (every term must match), limit, cursor. Returns the
+    best matches first as {"items": [...], "next_cursor": "..."}; each item
+    carries its relevance score.
+    """
+    try:
+        if not bearer_authorized('EXPORT_TOKEN'):
+            return jsonify({"error": "Access restricted in production"}), 403
+        
+        query = request.args.get('q', '').strip()
+        if not ContactService.search_terms(query):
+            return jsonify({"error": "q must contain at least one search term"}), 400
+        if len(query) > MAX_SEARCH_LENGTH:
+            return jsonify({"error": f"q is too long (max {MAX_SEARCH_LENGTH} characters)"}), 400
+        
+        limit = (request.args.get('limit', type=int) if 'limit' in request.args else DEFAULT_SEARCH_PAGE_SIZE)
+        if limit is None or limit < 1:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+        limit = min(limit, MAX_SEARCH_PAGE_SIZE)
+        
+        try:
+            hits, next_cursor = ContactService.search(query, limit, request.args.get('cursor'))
+        except InvalidCursor:
+            return jsonify({"error": "Invalid cursor"}), 400
+        
+        response = jsonify({
+            'items': [dict(contact.to_dict(), score=score) for contact, score in hits],
+            'next_cursor': next_cursor
+        })
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response
+        
+    except Exception as e:
+        logger.exception("Error searching contacts")
+        
+        # Return error with proper CORS headers
+        response = jsonify({"error": "Failed to search contacts"})
+        response.headers.add('Access-Control-Allow-Origin', '*')
+        return response, 500
+
 @bp.route('/<int:id>', methods=['GET'])
 def get_contact(id):
-    """Get a specific contact (development environment only)."""
+    """Get a specific contact (development environment only).
+
+    Contacts never change after insert, so responses carry a strong ETag and
+    are cacheable forever. The tag includes created_at, so it cannot describe
+    another row that later takes the same id (e.g. after a migration). If-None-Match
+    is answered without the database only for contacts in the response cache.
+    """
     try:
         # In production, don't allow accessing specific contacts
         if os.getenv('FLASK_ENV') == 'production':
             return jsonify({"error": "Access restricted in production"}), 403
         
-        contact = Contact.query.get(id)
-        if not contact:
-            # Return error with proper CORS headers
-            response = jsonify({"error": "Contact not found"})
-            response.headers.add('Access-Control-Allow-Origin', '*')
-            return response, 404
+        cache = current_app.extensions.get('contact_cache')
+        cached = cache.get(id) if cache is not None else None
+        if cached is not None:
+            etag, body = cached
+        else:
+            contact = db.session.get(Contact, id)
+            if not contact:
+                # Return error with proper CORS headers
+                response = jsonify({"error": "Contact not found"})
+                response.headers.add('Access-Control-Allow-Origin', '*')
+                return response, 404
             
-        # Return with proper CORS headers
-        response = jsonify(contact.to_dict())
-        response.headers.add('Access-Control-Allow-Origin', '*')
-        return response
+            etag = contact_etag(contact)
+            body = current_app.json.dumps(contact.to_dict()).encode('utf-8')
+            if cache is not None:
+                cache.put(id, etag, body)
+        
+        # If-None-Match uses weak comparison (RFC 9110), so W/ tags match too
+        if request.if_none_match.contains_weak(etag):
+            if cache is not None:
+                cache.record_not_modified()
+            return contact_response(Response(status=304), etag)
+        
+        return contact_response(Response(body, mimetype='application/json'), etag)
         
     except Exception as e:
         logger.exception(f"Error retrieving contact {id}")
@@ -220,6 +434,19 @@ def get_contact(id):
         response.headers.add('Access-Control-Allow-Origin', '*')
         return response, 500
 
+def contact_etag(contact):
+    """Strong validator for a stored contact: its id and creation time."""
+    stamp = contact.created_at.strftime('%Y%m%d%H%M%S%f') if contact.created_at else '0'
+    return f'contact-{contact.id}-{stamp}'
+
+def contact_response(response, etag):
+    """Add the validator, caching and CORS headers of a single-contact response."""
+    response.set_etag(etag)
+    # private: contact details must not be stored by shared caches
+    response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    return response
+
 # Health check route
 @bp.route('/health', methods=['GET'])
 def health_check():
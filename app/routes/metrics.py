@@ -0,0 +1,26 @@
+from flask import Blueprint, jsonify, request, current_app
+from app import db
+from app.services.auth import bearer_authorized
+from app.services.engine_profile import pool_snapshot
+import os
+
+bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+@bp.route('', methods=['GET'])
+def get_metrics():
+    """Process-local runtime metrics for this worker."""
+    if not bearer_authorized('METRICS_TOKEN'):
+        return jsonify({"error": "Access restricted in production"}), 403
+
+    dedup = current_app.extensions.get('submission_dedup')
+    contact_cache = current_app.extensions.get('contact_cache')
+    compression = current_app.extensions.get('compression')
+    response = jsonify({
+        'pid': os.getpid(),
+        'db_pool': pool_snapshot(db.engine, current_app.config.get('DB_POOL_PROFILE')),
+        'submission_dedup': dedup.stats() if dedup is not None else None,
+        'contact_cache': contact_cache.stats() if contact_cache is not None else None,
+        'compression': compression.stats() if compression is not None else None
+    })
+    response.headers['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,22 @@
+"""
+Bearer-token gating for endpoints that are restricted in production.
+
+Outside production every gated endpoint is open. In production a request must
+carry `Authorization: Bearer <token>` matching the endpoint's token variable;
+if that variable is unset the endpoint stays closed.
+"""
+
+import hmac
+import os
+
+from flask import request
+
+def bearer_authorized(env_var):
+    """True if the request may use an endpoint gated by the token in `env_var`."""
+    if os.getenv('FLASK_ENV') != 'production':
+        return True
+    token = os.getenv(env_var)
+    if not token:
+        return False
+    provided = request.headers.get('Authorization', '')
+    return hmac.compare_digest(provided.encode(), f'Bearer {token}'.encode())
@@ -0,0 +1,154 @@
+"""
+Append-only JSON Lines journal for submission backups.
+
+Each record is one line written with a single O_APPEND write, so concurrent
+workers never interleave or truncate each other and the cost of a backup does
+not depend on how many submissions came before it.
+
+The active segment is rotated once it reaches `max_bytes` or its first record
+is `max_age` seconds old; rotated segments are optionally gzipped and only the
+newest `keep_segments` are retained. Writers hold a shared file lock while
+appending and rotation takes it exclusively, so no record can land in a
+segment that is being compressed.
+"""
+
+import glob
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class BackupJournal:
+    """Rotating JSON Lines journal stored in a single directory."""
+
+    def __init__(self, directory, name='contact_submissions', max_bytes=5 * 1024 * 1024,
+                 max_age=86400, compress=True, keep_segments=10):
+        self.directory = directory
+        self.name = name
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.keep_segments = keep_segments
+
+        self.path = os.path.join(directory, f'{name}.jsonl')
+        self.lock_path = os.path.join(directory, f'.{name}.lock')
+        self._segment = None  # (inode, started_at) of the active segment
+
+    @contextmanager
+    def _locked(self, exclusive=False):
+        if fcntl is None:
+            yield
+            return
+        # A fresh descriptor per use, since flock state is shared by everything
+        # holding the same open file (other threads, forked children)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+    def append(self, record):
+        """Append one record to the active segment."""
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+        self._maybe_rotate()
+
+        with self._locked():
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def _segment_started(self, stat):
+        # Read the first record once per segment; rotation replaces the inode
+        if self._segment is None or self._segment[0] != stat.st_ino:
+            started = stat.st_mtime
+            try:
+                with open(self.path, 'rb') as f:
+                    first = json.loads(f.readline())
+                started = datetime.fromisoformat(first['timestamp'])
+                # Records are stamped with the contact's naive UTC created_at
+                if started.tzinfo is None:
+                    started = started.replace(tzinfo=timezone.utc)
+                started = started.timestamp()
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+            self._segment = (stat.st_ino, started)
+        return self._segment[1]
+
+    def _needs_rotation(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if stat.st_size == 0:
+            return False
+        if stat.st_size >= self.max_bytes:
+            return True
+        return self.max_age is not None and time.time() - self._segment_started(stat) >= self.max_age
+
+    def _maybe_rotate(self):
+        if not self._needs_rotation():
+            return
+
+        with self._locked(exclusive=True):
+            # Another worker may have rotated while we waited for the lock
+            if self._needs_rotation():
+                self.rotate()
+
+    def rotate(self):
+        """Close the active segment and start a new one. Caller holds the lock."""
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        rotated = os.path.join(self.directory, f'{self.name}-{stamp}.jsonl')
+        os.rename(self.path, rotated)
+        self._segment = None
+
+        if self.compress:
+            with open(rotated, 'rb') as src, gzip.open(rotated + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+
+        if self.keep_segments is not None:
+            segments = self.segments()
+            for old in segments[:max(0, len(segments) - self.keep_segments)]:
+                os.remove(old)
+        logger.info(f"Rotated backup journal to {os.path.basename(rotated)}")
+
+    def segments(self):
+        """Rotated segment paths, oldest first."""
+        pattern = os.path.join(self.directory, f'{self.name}-*.jsonl*')
+        return sorted(glob.glob(pattern))
+
+    def iter_records(self, include_rotated=True):
+        """Stream records from oldest to newest without loading whole files."""
+        paths = self.segments() if include_rotated else []
+        if os.path.exists(self.path):
+            paths.append(self.path)
+
+        for path in paths:
+            opener = gzip.open if path.endswith('.gz') else open
+            try:
+                with opener(path, 'rt', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            logger.warning(f"Skipping corrupt line in {os.path.basename(path)}")
+            except FileNotFoundError:
+                # Rotated away or pruned while we were reading
+                continue
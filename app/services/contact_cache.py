@@ -0,0 +1,76 @@
+"""
+Per-worker cache of serialized contact responses.
+
+Contacts never change once stored, so GET /api/contacts/<id> keeps the ETag
+and JSON body of recently read contacts in an LRU keyed by id and serves
+repeats without a query or re-serialization. Clients revalidating with the
+ETag of a cached contact get 304 without touching the database.
+
+Size with CONTACT_CACHE_MAX_ENTRIES (0 disables the cache).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+class ContactResponseCache:
+    """LRU of (ETag, serialized body) pairs with hit/miss counters."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._bodies = OrderedDict()  # id -> (etag, JSON bytes)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def __len__(self):
+        return len(self._bodies)
+
+    def get(self, contact_id):
+        """The cached (etag, body) for `contact_id`, or None."""
+        with self._lock:
+            entry = self._bodies.get(contact_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._bodies.move_to_end(contact_id)
+            self.hits += 1
+            return entry
+
+    def put(self, contact_id, etag, body):
+        with self._lock:
+            self._bodies[contact_id] = (etag, body)
+            self._bodies.move_to_end(contact_id)
+            if len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self):
+        """Counters for /api/metrics."""
+        with self._lock:
+            return {
+                'entries': len(self._bodies),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._bodies.clear()
+
+def init_contact_cache(app):
+    """Register the contact response cache on the app unless it is sized to 0."""
+    max_entries = int(os.getenv('CONTACT_CACHE_MAX_ENTRIES', 1024))
+    if max_entries <= 0:
+        return None
+
+    cache = ContactResponseCache(max_entries=max_entries)
+    app.extensions['contact_cache'] = cache
+    return cache
@@ -0,0 +1,237 @@
+from sqlalchemy import insert, select, text, tuple_
+from app import db
+from app.models.contact import Contact
+from app.models.outbox import NotificationOutbox
+from datetime import datetime
+import base64
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+CONTACT_FIELDS = ('name', 'email', 'phone', 'company', 'message')
+EXPORT_COLUMNS = ('id',) + CONTACT_FIELDS + ('created_at',)
+
+SEARCH_TERM_PATTERN = re.compile(r'\S+')
+
+# Best match first; FTS5 ranks by bm25 (lower is better), PostgreSQL by
+# ts_rank_cd (higher is better). Both break ties on id.
+SQLITE_SEARCH = """
+    SELECT rowid AS id, rank AS rank FROM contact_search
+    WHERE contact_search MATCH :query {after}
+    ORDER BY rank, rowid LIMIT :limit
+"""
+SQLITE_SEARCH_AFTER = "AND (rank > :rank OR (rank = :rank AND rowid > :id))"
+
+POSTGRES_SEARCH = """
+    SELECT id, rank FROM (
+        SELECT id, ts_rank_cd(search_vector, query)::float8 AS rank
+        FROM contact, plainto_tsquery('english', :query) AS query
+        WHERE search_vector @@ query
+    ) AS matches
+    WHERE TRUE {after}
+    ORDER BY rank DESC, id LIMIT :limit
+"""
+POSTGRES_SEARCH_AFTER = "AND (rank < :rank OR (rank = :rank AND id > :id))"
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+class ContactService:
+    @staticmethod
+    def notification_payload(values, created_at):
+        """Build the email notification payload for a stored contact."""
+        return {
+            'name': values['name'],
+            'email': values['email'],
+            'phone': values.get('phone') or '',
+            'company': values['company'],
+            'message': values['message'],
+            'timestamp': created_at.isoformat() if created_at else None
+        }
+
+    @staticmethod
+    def insert_many(rows, notify=True):
+        """Insert validated contacts with one multi-row INSERT ... RETURNING.
+
+        Rows must already be validated. A row may carry its own `created_at`
+        (e.g. a replayed backup); otherwise it is stamped now. Outbox entries
+        for the notifications are added to the same session, so they commit
+        together with the contacts. Returns one (id, created_at) pair per row,
+        in input order. The caller owns the transaction.
+        """
+        if not rows:
+            return []
+
+        values = [{field: row.get(field) for field in CONTACT_FIELDS} for row in rows]
+        if any(row.get('created_at') for row in rows):
+            # Every parameter set of a multi-row insert needs the same keys
+            now = datetime.utcnow()
+            for value, row in zip(values, rows):
+                value['created_at'] = row.get('created_at') or now
+
+        if db.session.get_bind().dialect.insert_returning:
+            # A Core insert on the table: the ORM bulk path issues one statement
+            # per row on SQLite when asked to keep parameter order
+            table = Contact.__table__
+            result = db.session.execute(
+                insert(table).returning(table.c.id, table.c.created_at, sort_by_parameter_order=True),
+                values
+            )
+            inserted = [(row.id, row.created_at) for row in result]
+        else:
+            # No RETURNING (SQLite before 3.35): stamp created_at here and
+            # take each id from the cursor's lastrowid
+            now = datetime.utcnow()
+            inserted = []
+            for row in values:
+                row.setdefault('created_at', now)
+                result = db.session.execute(insert(Contact.__table__).values(**row))
+                inserted.append((result.inserted_primary_key[0], row['created_at']))
+
+        if notify:
+            db.session.add_all([
+                NotificationOutbox(ContactService.notification_payload(row, created_at), contact_id=contact_id)
+                for row, (contact_id, created_at) in zip(values, inserted)
+            ])
+            db.session.flush()
+
+        return inserted
+
+    @staticmethod
+    def encode_cursor(contact):
+        """Opaque keyset cursor pointing just after `contact` in newest-first order."""
+        raw = f"{contact.created_at.isoformat()}|{contact.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Decode a cursor into its (created_at, id) position."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, contact_id = base64.urlsafe_b64decode(padded).decode().rsplit('|', 1)
+            return datetime.fromisoformat(created_at), int(contact_id)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise InvalidCursor("Invalid cursor") from e
+
+    @staticmethod
+    def newest_first():
+        """Contacts ordered newest first, with id as a unique tie-breaker."""
+        return select(Contact).order_by(Contact.created_at.desc(), Contact.id.desc())
+
+    @staticmethod
+    def page(limit, cursor=None):
+        """Return one keyset page of contacts and the cursor for the next page.
+
+        Seeks straight to the cursor position on (created_at, id), so every
+        page costs the same no matter how deep into the table it is.
+        """
+        query = ContactService.newest_first()
+        if cursor:
+            created_at, contact_id = ContactService.decode_cursor(cursor)
+            query = query.where(tuple_(Contact.created_at, Contact.id) < tuple_(created_at, contact_id))
+
+        # Fetch one extra row to learn whether another page exists
+        contacts = db.session.execute(query.limit(limit + 1)).scalars().all()
+        next_cursor = None
+        if len(contacts) > limit:
+            contacts = contacts[:limit]
+            next_cursor = ContactService.encode_cursor(contacts[-1])
+        return contacts, next_cursor
+
+    @staticmethod
+    def encode_search_cursor(rank, contact_id):
+        """Opaque keyset cursor pointing just after a search hit."""
+        raw = f"{rank!r}|{contact_id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_search_cursor(cursor):
+        """Decode a search cursor into its (rank, id) position."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            rank, contact_id = base64.urlsafe_b64decode(padded).decode().rsplit('|', 1)
+            return float(rank), int(contact_id)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise InvalidCursor("Invalid cursor") from e
+
+    @staticmethod
+    def search_terms(query):
+        """Split a free-text query into terms; every term must match."""
+        return [term for term in SEARCH_TERM_PATTERN.findall(query) if re.search(r'\w', term)]
+
+    @staticmethod
+    def search(query, limit, cursor=None):
+        """Return one ranked page of contacts matching `query` and the next cursor.
+
+        Served by the full-text index from migration v0002 (FTS5 on SQLite, a
+        GIN tsvector index on PostgreSQL). Each page seeks past the cursor's
+        (rank, id) position. Returns ([(contact, score)], next_cursor), where
+        a higher score is a better match.
+        """
+        terms = ContactService.search_terms(query)
+        if not terms:
+            return [], None
+
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'sqlite':
+            # Each term is a quoted FTS5 string, so user input is never parsed
+            # as query syntax; adjacent strings are ANDed
+            match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+            statement, after = SQLITE_SEARCH, SQLITE_SEARCH_AFTER
+        elif dialect == 'postgresql':
+            match = ' '.join(terms)
+            statement, after = POSTGRES_SEARCH, POSTGRES_SEARCH_AFTER
+        else:
+            raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+        params = {'query': match, 'limit': limit + 1}
+        if cursor:
+            params['rank'], params['id'] = ContactService.decode_search_cursor(cursor)
+        hits = db.session.execute(
+            text(statement.format(after=after if cursor else '')), params
+        ).all()
+
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_cursor = ContactService.encode_search_cursor(hits[-1].rank, hits[-1].id)
+
+        contacts = {
+            contact.id: contact
+            for contact in db.session.execute(
+                select(Contact).where(Contact.id.in_([hit.id for hit in hits]))
+            ).scalars()
+        }
+        score = (lambda rank: -rank) if dialect == 'sqlite' else (lambda rank: rank)
+        return [(contacts[hit.id], score(hit.rank)) for hit in hits if hit.id in contacts], next_cursor
+
+    @staticmethod
+    def iter_all(chunk_size=500):
+        """Stream every contact newest first from a server-side cursor."""
+        result = db.session.execute(
+            ContactService.newest_first().execution_options(yield_per=chunk_size)
+        )
+        for contact in result.scalars():
+            yield contact
+
+    @staticmethod
+    def iter_export_rows(since=None, chunk_size=1000):
+        """Stream plain row tuples oldest first, bypassing ORM object construction.
+
+        Uses a server-side cursor, so memory stays bounded however many rows
+        are exported. With `since`, only rows created at or after it are
+        returned; rows sharing that exact timestamp are repeated rather than
+        risk being skipped, so consumers should upsert by id.
+        """
+        table = Contact.__table__
+        query = select(*(table.c[name] for name in EXPORT_COLUMNS)).order_by(table.c.created_at, table.c.id)
+        if since is not None:
+            query = query.where(table.c.created_at >= since)
+
+        result = db.session.execute(
+            query,
+            execution_options={'stream_results': True, 'yield_per': chunk_size}
+        )
+        for partition in result.partitions():
+            yield from partition
@@ -0,0 +1,219 @@
+"""
+In-process detection of repeated contact submissions.
+
+Double-clicks and replayed bot submissions are caught before they cost a
+database insert and a notification email:
+
+- exact: a TTL-bounded LRU keyed by a hash of email, company and the
+  whitespace- and case-normalized message
+- near: per (email, company), the SimHash fingerprints of recent messages; a
+  new message within `near_distance` bits of one of them is a near-duplicate
+
+A submission is claimed before it is stored, so concurrent copies of it (the
+double-click case) see the claim and are rejected too. State is per process;
+each worker remembers what it stored itself.
+
+Enable with DEDUP_ENABLED (default true); tune with DEDUP_TTL_SECONDS,
+DEDUP_MAX_ENTRIES and DEDUP_NEAR_DISTANCE.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+WORD_PATTERN = re.compile(r'\w+')
+
+FINGERPRINT_BITS = 64
+FINGERPRINT_MASK = (1 << FINGERPRINT_BITS) - 1
+
+# Shorter messages have too few features for a stable fingerprint, so they
+# are only matched exactly
+MIN_NEAR_WORDS = 8
+
+EXACT = 'exact'
+NEAR = 'near'
+
+def simhash(words):
+    """64-bit SimHash of a message's words.
+
+    Every word hash votes on every bit. The votes are tallied bit-sliced:
+    `planes[i]` holds bit i of all 64 per-bit counters, so adding one hash is
+    a ripple-carry over a handful of integers rather than 64 separate counts.
+    Python's str hash is randomized per process, which is fine for an index
+    that never leaves the process.
+    """
+    hashes = [hash(word) & FINGERPRINT_MASK for word in words]
+    planes = []
+    for carry in hashes:
+        for i, plane in enumerate(planes):
+            planes[i] = plane ^ carry
+            carry &= plane
+            if not carry:
+                break
+        else:
+            if carry:
+                planes.append(carry)
+
+    # Set the bits whose counter exceeds half the votes, comparing all 64
+    # counters against the threshold at once from the most significant bit
+    threshold = len(hashes) // 2
+    greater, equal = 0, FINGERPRINT_MASK
+    for i in range(max(len(planes), threshold.bit_length()) - 1, -1, -1):
+        plane = planes[i] if i < len(planes) else 0
+        if (threshold >> i) & 1:
+            equal &= plane
+        else:
+            greater |= equal & plane
+            equal &= ~plane
+    return greater
+
+class Claim:
+    """A submission reserved by `SubmissionDeduplicator.claim` until it is stored."""
+
+    __slots__ = ('exact_key', 'scope', 'fingerprint', 'contact_id', 'expires_at')
+
+    def __init__(self, exact_key, scope, fingerprint, expires_at):
+        self.exact_key = exact_key
+        self.scope = scope
+        self.fingerprint = fingerprint
+        self.contact_id = None
+        self.expires_at = expires_at
+
+class SubmissionDeduplicator:
+    """Exact and near-duplicate index over recent submissions."""
+
+    def __init__(self, ttl=600, max_entries=10000, near_distance=8, max_per_scope=16, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.near_distance = near_distance
+        self.max_per_scope = max_per_scope
+        self.clock = clock
+
+        self._exact = OrderedDict()   # exact key -> Claim
+        self._scopes = OrderedDict()  # (email, company) -> list of Claims, oldest first
+        self._lock = threading.Lock()
+
+        self.hits = {EXACT: 0, NEAR: 0}
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._exact)
+
+    def claim(self, values):
+        """Reserve a validated submission unless it repeats a recent one.
+
+        Returns (None, claim) for a new submission; the caller must then
+        `complete` or `release` the claim. For a repeat, returns (kind, match)
+        where kind is EXACT or NEAR and match.contact_id is the stored id
+        (None while the original is still being stored).
+        """
+        email = values['email'].lower()
+        company = values['company'].lower()
+        words = WORD_PATTERN.findall(values['message'].lower())
+        exact_key = hashlib.blake2b(
+            '\0'.join((email, company, ' '.join(words))).encode('utf-8'), digest_size=16
+        ).digest()
+        scope = (email, company)
+        fingerprint = simhash(words) if len(words) >= MIN_NEAR_WORDS else None
+
+        with self._lock:
+            now = self.clock()
+            match = self._exact.get(exact_key)
+            if match is not None and match.expires_at > now:
+                self.hits[EXACT] += 1
+                return EXACT, match
+
+            recent = self._scopes.get(scope)
+            if recent is not None and fingerprint is not None:
+                for match in recent:
+                    if (match.expires_at > now and match.fingerprint is not None
+                            and bin(match.fingerprint ^ fingerprint).count('1') <= self.near_distance):
+                        self.hits[NEAR] += 1
+                        return NEAR, match
+
+            self.misses += 1
+            claim = Claim(exact_key, scope, fingerprint, now + self.ttl)
+            self._add(claim, now)
+            return None, claim
+
+    def complete(self, claim, contact_id):
+        """Record the id the claimed submission was stored under."""
+        claim.contact_id = contact_id
+
+    def release(self, claim):
+        """Forget a claim whose submission was not stored."""
+        with self._lock:
+            if self._exact.get(claim.exact_key) is claim:
+                del self._exact[claim.exact_key]
+            recent = self._scopes.get(claim.scope)
+            if recent is not None:
+                try:
+                    recent.remove(claim)
+                except ValueError:
+                    pass
+                if not recent:
+                    del self._scopes[claim.scope]
+
+    def _add(self, claim, now):
+        exact = self._exact
+        exact[claim.exact_key] = claim
+        exact.move_to_end(claim.exact_key)
+
+        recent = self._scopes.get(claim.scope)
+        if recent is None:
+            # A plain list: a deque's fixed block costs far more per scope
+            recent = self._scopes[claim.scope] = []
+        recent.append(claim)
+        if len(recent) > self.max_per_scope:
+            del recent[0]
+        self._scopes.move_to_end(claim.scope)
+
+        # Entries are added in expiry order, so expired ones sit at the front
+        for _ in range(2):
+            oldest = next(iter(exact.values()))
+            if oldest.expires_at > now or oldest is claim:
+                break
+            exact.popitem(last=False)
+        while len(exact) > self.max_entries:
+            exact.popitem(last=False)
+
+        for _ in range(2):
+            oldest_scope, oldest = next(iter(self._scopes.items()))
+            if oldest[-1].expires_at > now or oldest_scope == claim.scope:
+                break
+            del self._scopes[oldest_scope]
+        while len(self._scopes) > self.max_entries:
+            self._scopes.popitem(last=False)
+
+    def stats(self):
+        """Counters for /api/metrics."""
+        with self._lock:
+            return {
+                'entries': len(self._exact),
+                'scopes': len(self._scopes),
+                'exact_hits': self.hits[EXACT],
+                'near_hits': self.hits[NEAR],
+                'misses': self.misses,
+            }
+
+    def reset(self):
+        """Forget every submission."""
+        with self._lock:
+            self._exact.clear()
+            self._scopes.clear()
+
+def init_submission_dedup(app):
+    """Register the submission deduplicator on the app unless DEDUP_ENABLED=false."""
+    if os.getenv('DEDUP_ENABLED', 'true').lower() != 'true':
+        return None
+
+    dedup = SubmissionDeduplicator(
+        ttl=float(os.getenv('DEDUP_TTL_SECONDS', 600)),
+        max_entries=int(os.getenv('DEDUP_MAX_ENTRIES', 10000)),
+        near_distance=int(os.getenv('DEDUP_NEAR_DISTANCE', 8))
+    )
+    app.extensions['submission_dedup'] = dedup
+    return dedup
@@ -1,15 +1,19 @@
 import os
 import json
-import smtplib
 import html
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import logging
 import re
 
+from app.services import smtp_pool
+from app.services.backup_journal import BackupJournal
+
 logger = logging.getLogger(__name__)
 
+_backup_journal = None
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class EmailService:
     @staticmethod
     def sanitize_html(text):
@@ -21,6 +25,33 @@ class EmailService:
         # Convert newlines to <br> tags for readability
         return escaped.replace('\n', '<br>')
 
+    @staticmethod
+    def is_configured():
+        """Check whether SMTP credentials are available."""
+        return bool(os.getenv('EMAIL_HOST') and os.getenv('EMAIL_USER') and os.getenv('EMAIL_PASS'))
+
+    @staticmethod
+    def get_recipients():
+        """Parse EMAIL_TO, which may list several comma-separated addresses."""
+        email_to = os.getenv('EMAIL_TO', 'info@thorsignia.in')
+        return [address.strip() for address in email_to.split(',') if address.strip()]
+
+    @staticmethod
+    def get_smtp_pool():
+        """Return the shared SMTP session pool for the configured server."""
+        return smtp_pool.get_smtp_pool(
+            os.getenv('EMAIL_HOST'),
+            int(os.getenv('EMAIL_PORT', 587)),
+            os.getenv('EMAIL_USER'),
+            os.getenv('EMAIL_PASS'),
+            use_ssl=os.getenv('EMAIL_SECURE', 'false').lower() == 'true',
+            starttls=os.getenv('EMAIL_STARTTLS', 'true').lower() == 'true',
+            timeout=10,  # 10 seconds timeout
+            max_connections=int(os.getenv('SMTP_POOL_SIZE', 2)),
+            idle_timeout=int(os.getenv('SMTP_IDLE_TIMEOUT', 60)),
+            keepalive_interval=int(os.getenv('SMTP_KEEPALIVE_INTERVAL', 15))
+        )
+
     @staticmethod
     def send_contact_notification(contact_data):
         """Send an email notification when a new contact form is submitted."""
@@ -37,26 +68,26 @@ class EmailService:
                     return {"success": False, "error": f"Missing required field: {field}"}
             
             # Check if required environment variables exist
-            if os.getenv('EMAIL_HOST') and os.getenv('EMAIL_USER') and os.getenv('EMAIL_PASS'):
+            if EmailService.is_configured():
                 # Email configuration
-                smtp_host = os.getenv('EMAIL_HOST')
-                smtp_port = int(os.getenv('EMAIL_PORT', 587))
-                smtp_secure = os.getenv('EMAIL_SECURE', 'false').lower() == 'true'
-                smtp_user = os.getenv('EMAIL_USER')
-                smtp_pass = os.getenv('EMAIL_PASS')
                 email_from = os.getenv('EMAIL_FROM', 'noreply@thorsignia.in')
-                email_to = os.getenv('EMAIL_TO', 'info@thorsignia.in')
+                recipients = EmailService.get_recipients()
                 
                 # Validate email format
-                email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-                if not re.match(email_pattern, email_from) or not re.match(email_pattern, email_to):
+                if not EMAIL_PATTERN.match(email_from) or not recipients or \
+                        not all(EMAIL_PATTERN.match(address) for address in recipients):
                     logger.error("Invalid email configuration")
                     return {"success": False, "error": "Invalid email configuration"}
                 
+                # Deferred so that cold starts don't load the email stack
+                import smtplib
+                from email.mime.multipart import MIMEMultipart
+                from email.mime.text import MIMEText
+                
                 # Create message
                 msg = MIMEMultipart()
                 msg['From'] = email_from
-                msg['To'] = email_to
+                msg['To'] = ', '.join(recipients)
                 
                 # Sanitize subject data
                 safe_name = EmailService.sanitize_html(contact_data['name']).replace('<br>', ' ')
@@ -79,18 +110,9 @@ class EmailService:
                 
                 msg.attach(MIMEText(html_content, 'html'))
                 
-                # Connect to SMTP server with timeout
-                timeout = 10  # 10 seconds timeout
+                # Reuse a pooled, already authenticated SMTP session
                 try:
-                    if smtp_secure:
-                        server = smtplib.SMTP_SSL(smtp_host, smtp_port, timeout=timeout)
-                    else:
-                        server = smtplib.SMTP(smtp_host, smtp_port, timeout=timeout)
-                        server.starttls()
-                    
-                    server.login(smtp_user, smtp_pass)
-                    server.send_message(msg)
-                    server.quit()
+                    EmailService.get_smtp_pool().send_message(msg)
                     
                     logger.info(f"Email notification sent for contact from {contact_data['email']}")
                     return {"success": True, "message": "Email notification sent"}
@@ -115,9 +137,127 @@ class EmailService:
             logger.error(f"Failed to send email notification: {str(e)}")
             return {"success": False, "error": str(e)}
     
+    @staticmethod
+    def render_digest_html(submissions):
+        """Render a batch of submissions as one HTML summary."""
+        rows = []
+        for contact_data in submissions:
+            rows.append(f"""
+                <tr>
+                    <td>{EmailService.sanitize_html(contact_data.get('timestamp') or '')}</td>
+                    <td>{EmailService.sanitize_html(contact_data.get('name', ''))}</td>
+                    <td>{EmailService.sanitize_html(contact_data.get('email', ''))}</td>
+                    <td>{EmailService.sanitize_html(contact_data.get('phone') or 'Not provided')}</td>
+                    <td>{EmailService.sanitize_html(contact_data.get('company', ''))}</td>
+                    <td>{EmailService.sanitize_html(contact_data.get('message', ''))}</td>
+                </tr>""")
+        
+        return f"""
+        <h2>{len(submissions)} New Contact Form Submissions</h2>
+        <p><strong>Date:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        <hr>
+        <table border="1" cellpadding="6" cellspacing="0">
+            <tr>
+                <th>Received</th><th>Name</th><th>Email</th><th>Phone</th><th>Company</th><th>Message</th>
+            </tr>{''.join(rows)}
+        </table>
+        """
+
+    @staticmethod
+    def send_digest_notification(submissions, delivered_to=()):
+        """Send one summary email covering a batch of contact submissions.
+
+        Each recipient in EMAIL_TO, except those in `delivered_to`, gets its
+        own copy of the digest. The result lists the recipients that accepted
+        it under "delivered", and only succeeds when every one of them did.
+        """
+        try:
+            if not isinstance(submissions, list) or not submissions:
+                return {"success": False, "error": "No submissions to send"}
+            
+            if not EmailService.is_configured():
+                logger.warning("Email configuration not found - logging digest instead")
+                for contact_data in submissions:
+                    if os.getenv('FLASK_ENV') != 'production':
+                        logger.info(f"CONTACT SUBMISSION: {json.dumps(contact_data)}")
+                    else:
+                        logger.info(f"CONTACT SUBMISSION from: {contact_data.get('email', 'unknown')}")
+                return {"success": False, "message": "Email not configured, submissions logged"}
+            
+            email_from = os.getenv('EMAIL_FROM', 'noreply@thorsignia.in')
+            recipients = [address for address in EmailService.get_recipients() if EMAIL_PATTERN.match(address)]
+            if not EMAIL_PATTERN.match(email_from) or not recipients:
+                logger.error("Invalid email configuration")
+                return {"success": False, "error": "Invalid email configuration"}
+            recipients = [address for address in recipients if address not in delivered_to]
+            if not recipients:
+                return {"success": True, "message": "Digest already delivered", "delivered": []}
+            
+            import smtplib
+            from email.mime.multipart import MIMEMultipart
+            from email.mime.text import MIMEText
+            
+            html_content = EmailService.render_digest_html(submissions)
+            subject = f"{len(submissions)} New Contact Form Submissions"
+            pool = EmailService.get_smtp_pool()
+            
+            delivered, errors = [], []
+            for recipient in recipients:
+                msg = MIMEMultipart()
+                msg['From'] = email_from
+                msg['To'] = recipient
+                msg['Subject'] = subject
+                msg.attach(MIMEText(html_content, 'html'))
+                try:
+                    pool.send_message(msg)
+                    delivered.append(recipient)
+                except (smtplib.SMTPException, TimeoutError, OSError) as smtp_err:
+                    logger.error(f"SMTP error sending digest to {recipient}: {str(smtp_err)}")
+                    errors.append(f"{recipient}: {str(smtp_err)}")
+            
+            if errors:
+                # Recipients that accepted it are recorded, so a retry skips them
+                return {"success": False, "error": f"SMTP error: {'; '.join(errors)}", "delivered": delivered}
+            
+            logger.info(f"Digest of {len(submissions)} submissions sent to {len(delivered)} recipient(s)")
+            return {"success": True, "message": "Digest sent", "delivered": delivered}
+        
+        except Exception as e:
+            logger.error(f"Failed to send digest notification: {str(e)}")
+            return {"success": False, "error": str(e)}
+    
+    @staticmethod
+    def get_backup_journal():
+        """Return the shared backup journal, creating its directory on first use."""
+        global _backup_journal
+        if _backup_journal is not None:
+            return _backup_journal
+        
+        backup_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+        
+        # Validate paths to prevent path traversal attacks
+        canonical_backup_dir = os.path.realpath(backup_dir)
+        canonical_app_dir = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+        
+        if not canonical_backup_dir.startswith(canonical_app_dir):
+            logger.error("Attempted path traversal detected")
+            raise ValueError("Invalid backup directory")
+        
+        # Create backup directory if it doesn't exist
+        os.makedirs(canonical_backup_dir, exist_ok=True)
+        
+        _backup_journal = BackupJournal(
+            canonical_backup_dir,
+            max_bytes=int(os.getenv('BACKUP_MAX_BYTES', 5 * 1024 * 1024)),
+            max_age=int(os.getenv('BACKUP_ROTATE_SECONDS', 86400)),
+            compress=os.getenv('BACKUP_COMPRESS', 'true').lower() == 'true',
+            keep_segments=int(os.getenv('BACKUP_KEEP_SEGMENTS', 10))
+        )
+        return _backup_journal
+    
     @staticmethod
     def backup_submission(contact_data):
-        """Create a JSON file backup of submissions (only in development)."""
+        """Append the submission to the JSON Lines backup journal (only in development)."""
         if os.getenv('FLASK_ENV') == 'production':
             return {"success": False, "reason": "Backup not supported in production environment"}
         
@@ -126,58 +266,24 @@ class EmailService:
             if not isinstance(contact_data, dict):
                 return {"success": False, "error": "Invalid data format"}
             
-            backup_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
-            backup_file = os.path.join(backup_dir, 'contact_submissions.json')
-            
-            # Validate paths to prevent path traversal attacks
-            canonical_backup_dir = os.path.realpath(backup_dir)
-            canonical_app_dir = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
-            
-            if not canonical_backup_dir.startswith(canonical_app_dir):
-                logger.error("Attempted path traversal detected")
-                return {"success": False, "error": "Invalid backup directory"}
-            
-            # Create backup directory if it doesn't exist
-            if not os.path.exists(backup_dir):
-                os.makedirs(backup_dir)
-            
-            # Add timestamp and sanitize data
+            # Stamp with the stored created_at (UTC), so that replaying the
+            # journal with import_contacts.py recognizes rows already stored
             submission_with_timestamp = {
                 'name': str(contact_data.get('name', '')),
                 'email': str(contact_data.get('email', '')),
                 'phone': str(contact_data.get('phone', '')),
                 'company': str(contact_data.get('company', '')),
                 'message': str(contact_data.get('message', '')),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': contact_data.get('timestamp') or datetime.utcnow().isoformat()
             }
             
-            # Read existing data or create empty array
-            submissions = []
-            if os.path.exists(backup_file):
-                try:
-                    with open(backup_file, 'r') as f:
-                        file_content = f.read()
-                        if file_content.strip():
-                            submissions = json.loads(file_content)
-                        else:
-                            submissions = []
-                except json.JSONDecodeError:
-                    logger.warning("Invalid JSON in backup file, creating new backup")
-                    submissions = []
-            
-            # Add new submission and write back to file
-            submissions.append(submission_with_timestamp)
+            # Constant-cost append; old segments are rotated out by the journal
+            journal = EmailService.get_backup_journal()
+            journal.append(submission_with_timestamp)
             
-            # Limit the number of stored submissions to prevent file size issues
-            if len(submissions) > 1000:
-                submissions = submissions[-1000:]  # Keep only the most recent 1000
-            
-            with open(backup_file, 'w') as f:
-                json.dump(submissions, f, indent=2)
-            
-            logger.info(f"Backup saved to: {backup_file}")
+            logger.debug(f"Backup saved to: {journal.path}")
             return {"success": True}
         
         except Exception as e:
             logger.error(f"Failed to backup submission: {str(e)}")
-            return {"success": False, "error": str(e)} 
\ No newline at end of file
+            return {"success": False, "error": str(e)}
@@ -0,0 +1,170 @@
+"""
+SQLAlchemy engine pooling profiles.
+
+The profile is chosen per deployment (DB_POOL_PROFILE, or inferred):
+- gunicorn: long-lived workers keep a QueuePool of pre-pinged connections,
+  recycled before the server or a proxy drops them (default)
+- serverless: Vercel functions open a connection per checkout (NullPool), or
+  reuse a single pre-pinged connection across warm invocations with
+  DB_SERVERLESS_REUSE=true
+- sqlite: local development keeps SQLAlchemy's defaults
+
+Pools are metered: checkout wait time and the number of connections opened
+are exposed through `pool_snapshot()`.
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+PROFILE_GUNICORN = 'gunicorn'
+PROFILE_SERVERLESS = 'serverless'
+PROFILE_SQLITE = 'sqlite'
+
+class PoolMetrics:
+    """Thread-safe counters for pool checkouts and connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.connections_opened = 0
+
+    def record_checkout(self, waited):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+
+    def record_connect(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'connections_opened': self.connections_opened,
+                'wait_ms_total': round(self.wait_total * 1000, 3),
+                'wait_ms_avg': round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_ms_max': round(self.wait_max * 1000, 3)
+            }
+
+pool_metrics = PoolMetrics()
+
+_engines = weakref.WeakSet()
+
+class MeteredPoolMixin:
+    """Times how long each checkout waits for a connection (including connecting)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.record_checkout(time.perf_counter() - started)
+
+class MeteredQueuePool(MeteredPoolMixin, QueuePool):
+    pass
+
+class MeteredNullPool(MeteredPoolMixin, NullPool):
+    pass
+
+def select_profile(database_uri):
+    """The pooling profile for this deployment."""
+    profile = os.getenv('DB_POOL_PROFILE')
+    if profile:
+        return profile.lower()
+    if database_uri.startswith('sqlite'):
+        return PROFILE_SQLITE
+    if os.getenv('VERCEL'):
+        return PROFILE_SERVERLESS
+    return PROFILE_GUNICORN
+
+def engine_options(profile):
+    """SQLALCHEMY_ENGINE_OPTIONS for a profile."""
+    if profile == PROFILE_GUNICORN:
+        return {
+            'poolclass': MeteredQueuePool,
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 5)),
+            'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+            # Recycle before proxy/NAT idle timeouts; pre-ping catches the rest
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 300)),
+            'pool_pre_ping': True,
+            'pool_use_lifo': True
+        }
+    if profile == PROFILE_SERVERLESS:
+        if os.getenv('DB_SERVERLESS_REUSE', 'false').lower() == 'true':
+            # One connection kept by the warm function instance
+            return {
+                'poolclass': MeteredQueuePool,
+                'pool_size': 1,
+                'max_overflow': 0,
+                'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 300)),
+                'pool_pre_ping': True
+            }
+        return {'poolclass': MeteredNullPool}
+    if profile != PROFILE_SQLITE:
+        logger.warning(f"Unknown DB_POOL_PROFILE '{profile}', using SQLAlchemy defaults")
+    return {}
+
+def init_engine_profile(app):
+    """Configure the engine options for the app's database. Call before db.init_app."""
+    profile = select_profile(app.config['SQLALCHEMY_DATABASE_URI'])
+    options = dict(engine_options(profile))
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    app.config['DB_POOL_PROFILE'] = profile
+    logger.info(f"Using '{profile}' database pool profile")
+    return profile
+
+def instrument_engine(engine):
+    """Count every new DBAPI connection and track the engine for fork handling."""
+    if not event.contains(engine, 'connect', _on_connect):
+        event.listen(engine, 'connect', _on_connect)
+    _engines.add(engine)
+
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.record_connect()
+
+def dispose_after_fork():
+    """Drop pooled connections inherited from the parent process.
+
+    For forking servers that load the app before forking (gunicorn --preload).
+    close=False leaves the parent's sockets alone; the child just forgets them
+    and opens its own.
+    """
+    for engine in list(_engines):
+        engine.dispose(close=False)
+    pool_metrics.reset()
+
+def pool_snapshot(engine, profile=None):
+    """Current pool occupancy plus the checkout metrics."""
+    pool = engine.pool
+    snapshot = {
+        'profile': profile,
+        'pool': type(pool).__name__
+    }
+    if isinstance(pool, QueuePool):
+        snapshot.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0)
+        })
+    snapshot.update(pool_metrics.snapshot())
+    return snapshot
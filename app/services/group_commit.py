@@ -0,0 +1,146 @@
+"""
+Group commit for contact inserts.
+
+Concurrent requests in a worker hand their validated rows to a single committer
+thread, which writes everything that arrived within a few milliseconds (or up
+to a maximum batch size) in one multi-row insert and one commit. Each request
+still waits for, and receives, its own id.
+
+Enable with GROUP_COMMIT=true; tune with GROUP_COMMIT_MAX_BATCH and
+GROUP_COMMIT_MAX_DELAY_MS.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from app import db
+from app.services.contact_service import ContactService
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class GroupCommitter:
+    """Collects single-row inserts from many threads and commits them together."""
+
+    def __init__(self, app, max_batch=50, max_delay=0.005, timeout=10):
+        self.app = app
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.timeout = timeout
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_started(self):
+        # Started lazily so the thread is created in the serving process, after any fork
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='group-committer', daemon=True)
+                self._thread.start()
+                atexit.register(self.shutdown)
+
+    def submit(self, values):
+        """Queue a validated contact and block until it is committed.
+
+        Returns the (id, created_at) pair of the stored row. Raises
+        TimeoutError if the row was not picked up within `timeout`; it is then
+        never committed, so the caller can safely report failure.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((values, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Cancelling only succeeds while the committer has not taken the row
+            if future.cancel():
+                raise
+            # Its insert is already running; the outcome is moments away
+            return future.result()
+
+    def shutdown(self, timeout=10):
+        """Commit anything already queued and stop the committer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            stopping = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            # Skip rows whose request timed out and gave up on them
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if batch:
+                self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch):
+        with self.app.app_context():
+            try:
+                self._insert(batch)
+                return
+            except Exception as e:
+                db.session.rollback()
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    return
+                logger.warning(f"Group commit of {len(batch)} contacts failed, retrying individually: {e}")
+
+            # Isolate the failing row so the rest of the group still commits
+            for item in batch:
+                try:
+                    self._insert([item])
+                except Exception as e:
+                    db.session.rollback()
+                    item[1].set_exception(e)
+
+    @staticmethod
+    def _insert(batch):
+        inserted = ContactService.insert_many([values for values, _ in batch])
+        db.session.commit()
+
+        for (_, future), row in zip(batch, inserted):
+            future.set_result(row)
+
+def init_group_committer(app):
+    """Register a group committer on the app when GROUP_COMMIT is enabled."""
+    if os.getenv('GROUP_COMMIT', 'false').lower() != 'true':
+        return None
+
+    committer = GroupCommitter(
+        app,
+        max_batch=int(os.getenv('GROUP_COMMIT_MAX_BATCH', 50)),
+        max_delay=float(os.getenv('GROUP_COMMIT_MAX_DELAY_MS', 5)) / 1000
+    )
+    app.extensions['group_committer'] = committer
+    return committer
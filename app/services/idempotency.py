@@ -0,0 +1,263 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+A client that retries a request with the same `Idempotency-Key` header gets
+the response of the first attempt replayed, without the handler running
+again, so a retry after a timeout never stores or emails a submission twice.
+
+- The first request with a key reserves it; concurrent requests with the same
+  key get 409 until it finishes
+- Its response is stored for `ttl` seconds and replayed with an
+  `Idempotent-Replayed: true` header
+- Reusing a key with a different request body is rejected with 422
+- Server errors and rate-limited responses are not stored, so the retry runs
+
+Where responses live is pluggable (IDEMPOTENCY_BACKEND, defaulting to
+RATE_LIMIT_BACKEND): memory (per process), sqlite (shared by every worker on
+the host, in the rate limiter's file) or redis.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, jsonify, make_response, request
+
+from app.services.rate_limiter import RedisBackend, SQLiteBackend
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 86400))
+IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('IDEMPOTENCY_LOCK_SECONDS', 60))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv('IDEMPOTENCY_MAX_KEYS', 10000))
+
+MAX_KEY_LENGTH = 255
+
+class MemoryStore:
+    """Process-local records, LRU-bounded by `max_keys` and evicted by TTL."""
+
+    def __init__(self, max_keys=IDEMPOTENCY_MAX_KEYS):
+        self.max_keys = max_keys
+        self._records = OrderedDict()  # key -> (expires_at, record)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def reserve(self, key, record, now, lock_timeout):
+        with self._lock:
+            records = self._records
+            existing = records.get(key)
+            if existing is not None and existing[0] > now:
+                return existing[1]
+
+            records[key] = (now + lock_timeout, record)
+            records.move_to_end(key)
+
+            # Expired records are as good as absent
+            for _ in range(2):
+                oldest_key, (expires_at, _) = next(iter(records.items()))
+                if expires_at > now or oldest_key == key:
+                    break
+                del records[oldest_key]
+
+            if len(records) > self.max_keys:
+                records.popitem(last=False)
+            return None
+
+    def complete(self, key, record, now, ttl):
+        with self._lock:
+            self._records[key] = (now + ttl, record)
+            self._records.move_to_end(key)
+
+    def release(self, key):
+        with self._lock:
+            self._records.pop(key, None)
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+
+class SQLiteStore(SQLiteBackend):
+    """Records in the rate limiter's WAL-mode SQLite file, shared by all workers on a host."""
+
+    @staticmethod
+    def _initialize(conn, attempts=20):
+        SQLiteBackend._initialize(conn, attempts)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS idempotency '
+            '(key TEXT PRIMARY KEY, record TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM idempotency').fetchone()[0]
+
+    def reserve(self, key, record, now, lock_timeout):
+        conn = self._connection()
+        # Inserts, or takes over an expired record, in one atomic statement
+        reserved = conn.execute(
+            """
+            INSERT INTO idempotency (key, record, expires_at) VALUES (:key, :record, :expires_at)
+            ON CONFLICT (key) DO UPDATE SET record = :record, expires_at = :expires_at
+            WHERE expires_at <= :now
+            RETURNING key
+            """,
+            {'key': key, 'record': json.dumps(record), 'expires_at': now + lock_timeout, 'now': now}
+        ).fetchone()
+
+        local = self._local
+        local.hits += 1
+        if local.hits % self.purge_every == 0:
+            conn.execute('DELETE FROM idempotency WHERE expires_at <= ?', (now,))
+
+        if reserved is not None:
+            return None
+        row = conn.execute('SELECT record FROM idempotency WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def complete(self, key, record, now, ttl):
+        self._connection().execute(
+            'UPDATE idempotency SET record = ?, expires_at = ? WHERE key = ?',
+            (json.dumps(record), now + ttl, key)
+        )
+
+    def release(self, key):
+        self._connection().execute('DELETE FROM idempotency WHERE key = ?', (key,))
+
+    def reset(self):
+        self._connection().execute('DELETE FROM idempotency')
+
+class RedisStore:
+    """Records on a Redis-protocol server, expired by the server itself."""
+
+    def __init__(self, url='redis://localhost:6379/0', key_prefix='idempotency:'):
+        self.redis = RedisBackend(url, key_prefix=key_prefix)
+        self.key_prefix = key_prefix
+
+    def reserve(self, key, record, now, lock_timeout):
+        name = self.key_prefix + key
+        if self.redis.execute('SET', name, json.dumps(record), 'NX', 'PX', int(lock_timeout * 1000)):
+            return None
+        existing = self.redis.execute('GET', name)
+        return json.loads(existing) if existing else None
+
+    def complete(self, key, record, now, ttl):
+        self.redis.execute('SET', self.key_prefix + key, json.dumps(record), 'PX', int(ttl * 1000))
+
+    def release(self, key):
+        self.redis.execute('DEL', self.key_prefix + key)
+
+    def reset(self):
+        self.redis.reset()
+
+class IdempotencyCache:
+    """Stores the first response for each idempotency key over a pluggable store."""
+
+    def __init__(self, store=None, ttl=IDEMPOTENCY_TTL, lock_timeout=IDEMPOTENCY_LOCK_TIMEOUT, clock=time.time):
+        self.store = store if store is not None else MemoryStore()
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        # Wall-clock time so that records are comparable across processes
+        self.clock = clock
+
+    def begin(self, key, fingerprint):
+        """Reserve `key` for a request, or return the record already holding it.
+
+        Returns None when the caller should run the request. If the store is
+        unreachable the request runs too, rather than failing submissions.
+        """
+        try:
+            return self.store.reserve(key, {'fingerprint': fingerprint}, self.clock(), self.lock_timeout)
+        except Exception as e:
+            logger.warning(f"Idempotency store error, processing request: {e}")
+            return None
+
+    def finish(self, key, fingerprint, response):
+        """Store a finished response for replay, or free the key for a retry."""
+        try:
+            if response.status_code >= 500 or response.status_code == 429:
+                self.store.release(key)
+                return
+            record = {
+                'fingerprint': fingerprint,
+                'status': response.status_code,
+                'body': response.get_data(as_text=True),
+                'content_type': response.content_type,
+            }
+            self.store.complete(key, record, self.clock(), self.ttl)
+        except Exception as e:
+            logger.warning(f"Idempotency store error, response not cached: {e}")
+
+    def release(self, key):
+        """Free a reserved key without storing a response."""
+        try:
+            self.store.release(key)
+        except Exception as e:
+            logger.warning(f"Idempotency store error, key not released: {e}")
+
+    def reset(self):
+        """Forget every key."""
+        self.store.reset()
+
+def create_store():
+    """Build the store selected by IDEMPOTENCY_BACKEND (default: RATE_LIMIT_BACKEND)."""
+    backend = os.getenv('IDEMPOTENCY_BACKEND', os.getenv('RATE_LIMIT_BACKEND', 'memory')).lower()
+    if backend == 'sqlite':
+        path = os.getenv('RATE_LIMIT_SQLITE_PATH',
+                         os.path.join(tempfile.gettempdir(), 'thor-signia-ratelimit.sqlite3'))
+        return SQLiteStore(path)
+    if backend == 'redis':
+        return RedisStore(os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0'))
+    if backend != 'memory':
+        logger.warning(f"Unknown IDEMPOTENCY_BACKEND '{backend}', using memory")
+    return MemoryStore()
+
+idempotency_cache = IdempotencyCache(store=create_store())
+
+def error_response(message, status):
+    response = jsonify({"error": message})
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    return response, status
+
+def idempotent(f):
+    """Replay the stored response for requests that repeat an Idempotency-Key."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return f(*args, **kwargs)
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return error_response(f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters", 400)
+
+        # Keys are per endpoint; the body fingerprint catches reuse for another request
+        key = f'{request.method}:{request.path}:{key}'
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+
+        record = idempotency_cache.begin(key, fingerprint)
+        if record is not None:
+            if record['fingerprint'] != fingerprint:
+                return error_response("Idempotency-Key was already used for a different request", 422)
+            if 'status' not in record:
+                response, status = error_response("A request with this Idempotency-Key is in progress", 409)
+                response.headers['Retry-After'] = '1'
+                return response, status
+            response = Response(record['body'], status=record['status'], content_type=record['content_type'])
+            response.headers['Idempotent-Replayed'] = 'true'
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            return response
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            idempotency_cache.release(key)
+            raise
+        idempotency_cache.finish(key, fingerprint, response)
+        return response
+    return decorated_function
@@ -0,0 +1,342 @@
+"""
+Background delivery of contact notifications.
+
+Contact submissions write a NotificationOutbox row in the same transaction as
+the Contact row. This module drains that outbox off the request path, retrying
+failed deliveries with exponential backoff.
+
+Delivery modes (NOTIFICATION_MODE):
+- thread: a bounded thread pool inside each web worker (default)
+- after_response: drained once the response has been sent, as many entries as
+  the request queued (default on Vercel)
+- process: web workers only write the outbox; run
+  `python -m app.services.notification_worker` as a separate process, as the
+  Procfile's `worker` does alongside its `web` processes
+
+With NOTIFICATION_DIGEST enabled, pending entries are left in the outbox until
+the oldest has waited NOTIFICATION_DIGEST_WINDOW seconds or
+NOTIFICATION_DIGEST_MAX entries are due, then sent as a single summary email.
+An entry is sent once every recipient has accepted it; recipients that failed
+are retried with backoff while those that accepted are not mailed again.
+Anything still pending is flushed when the worker shuts down.
+"""
+
+import atexit
+import logging
+import os
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from flask import after_this_request, current_app
+from sqlalchemy import select, update
+
+from app import db
+from app.models.outbox import NotificationOutbox
+from app.services.email_service import EmailService
+from app.services.smtp_pool import close_smtp_pools, evict_idle_smtp_sessions
+
+logger = logging.getLogger(__name__)
+
+MODE_THREAD = 'thread'
+MODE_AFTER_RESPONSE = 'after_response'
+MODE_PROCESS = 'process'
+
+MAX_RETRY_DELAY = 3600  # Never wait more than an hour between attempts
+
+class NotificationWorker:
+    """Claims due outbox entries and delivers them on a bounded thread pool."""
+
+    def __init__(self, app, mode=MODE_THREAD, max_workers=2, poll_interval=5.0,
+                 max_attempts=5, retry_backoff=30, lease_seconds=120,
+                 digest_window=None, digest_max=100):
+        self.app = app
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self.digest_window = digest_window
+        self.digest_max = max(1, digest_max)
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._executor = None
+        self._dispatcher = None
+
+    @property
+    def digest_mode(self):
+        return self.digest_window is not None
+
+    @property
+    def running(self):
+        return self._dispatcher is not None and self._dispatcher.is_alive()
+
+    def start(self):
+        """Start the dispatcher thread and the delivery pool."""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='notification')
+        self._dispatcher = threading.Thread(target=self._run, name='notification-dispatcher',
+                                            daemon=True)
+        self._dispatcher.start()
+        atexit.register(self.shutdown)
+        logger.info(f"Notification worker started with {self.max_workers} delivery threads")
+
+    def wake(self):
+        """Signal that new outbox entries were committed."""
+        self._wakeup.set()
+
+    def shutdown(self, timeout=30):
+        """Stop claiming new entries and wait for in-flight deliveries."""
+        if self._dispatcher is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._dispatcher.join(timeout)
+        self._executor.shutdown(wait=True)
+        self._dispatcher = None
+        self._executor = None
+        if self.digest_mode:
+            self.flush()
+        close_smtp_pools()
+        logger.info("Notification worker stopped")
+
+    def drain(self, limit=None, force=False):
+        """Deliver due entries synchronously in the calling thread."""
+        delivered = 0
+        while limit is None or delivered < limit:
+            entry_ids = self.claim_batch(force=force)
+            if not entry_ids:
+                break
+            self.deliver_batch(entry_ids)
+            delivered += len(entry_ids)
+        return delivered
+
+    def flush(self):
+        """Send everything that is due, ignoring the digest window."""
+        return self.drain(force=True)
+
+    def claim_batch(self, force=False):
+        """Claim the next unit of work: one entry, or a full digest batch."""
+        if not self.digest_mode:
+            return self.claim(limit=1)
+        return self.claim(limit=self.digest_max, min_age=None if force else self.digest_window)
+
+    def claim(self, limit=1, min_age=None):
+        """Atomically mark up to `limit` due entries as being sent by this worker.
+
+        With `min_age`, nothing is claimed until `limit` entries are due or the
+        oldest due entry has waited at least `min_age` seconds.
+        """
+        with self.app.app_context():
+            now = datetime.utcnow()
+            claimable = [NotificationOutbox.STATUS_PENDING, NotificationOutbox.STATUS_SENDING]
+            candidates = db.session.execute(
+                select(NotificationOutbox.id, NotificationOutbox.attempts,
+                       NotificationOutbox.created_at)
+                .where(NotificationOutbox.status.in_(claimable),
+                       NotificationOutbox.next_attempt_at <= now)
+                .order_by(NotificationOutbox.created_at)
+                .limit(limit)
+            ).all()
+
+            if min_age is not None and candidates and len(candidates) < limit:
+                oldest = candidates[0].created_at
+                if oldest and oldest > now - timedelta(seconds=min_age):
+                    return []
+
+            claimed = []
+            for entry_id, attempts, _ in candidates:
+                # Entries stuck in "sending" past their lease belong to a dead worker
+                result = db.session.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id == entry_id,
+                           NotificationOutbox.attempts == attempts,
+                           NotificationOutbox.status.in_(claimable))
+                    .values(status=NotificationOutbox.STATUS_SENDING,
+                            attempts=attempts + 1,
+                            next_attempt_at=now + timedelta(seconds=self.lease_seconds))
+                )
+                if result.rowcount == 1:
+                    claimed.append(entry_id)
+            db.session.commit()
+            return claimed
+
+    def deliver(self, entry_id):
+        """Send one claimed entry and record the outcome."""
+        with self.app.app_context():
+            entry = db.session.get(NotificationOutbox, entry_id)
+            if entry is None:
+                return
+            payload = entry.get_payload()
+            # Don't hold a transaction open across the SMTP conversation
+            db.session.commit()
+
+            try:
+                result = EmailService.send_contact_notification(payload)
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+
+            self._record_result(entry, result)
+
+    def deliver_batch(self, entry_ids):
+        """Send claimed entries, as one digest when digest mode is enabled."""
+        if not self.digest_mode:
+            for entry_id in entry_ids:
+                self.deliver(entry_id)
+            return
+
+        with self.app.app_context():
+            entries = db.session.execute(
+                select(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(entry_ids))
+                .order_by(NotificationOutbox.created_at)
+            ).scalars().all()
+            if not entries:
+                return
+
+            # Entries retried after a partial failure only go to the
+            # recipients that missed them, so group them by who has them
+            groups = {}
+            for entry in entries:
+                groups.setdefault(frozenset(entry.get_delivered_to()), []).append(entry)
+            batches = [(delivered_to, group, [entry.get_payload() for entry in group])
+                       for delivered_to, group in groups.items()]
+            db.session.commit()
+
+            for delivered_to, group, payloads in batches:
+                try:
+                    result = EmailService.send_digest_notification(payloads, delivered_to=delivered_to)
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+
+                for entry in group:
+                    if result.get('delivered'):
+                        entry.add_delivered_to(result['delivered'])
+                    self._record_result(entry, result, commit=False)
+                db.session.commit()
+
+    def _record_result(self, entry, result, commit=True):
+        now = datetime.utcnow()
+        if result.get('success'):
+            entry.status = NotificationOutbox.STATUS_SENT
+            entry.sent_at = now
+            entry.last_error = None
+        elif not result.get('error'):
+            # Email is not configured; the submission was logged instead
+            entry.status = NotificationOutbox.STATUS_SKIPPED
+            entry.last_error = result.get('message')
+        elif entry.attempts >= self.max_attempts:
+            entry.status = NotificationOutbox.STATUS_FAILED
+            entry.last_error = result['error']
+            logger.error(f"Giving up on notification {entry.id} after {entry.attempts} attempts")
+        else:
+            delay = min(self.retry_backoff * 2 ** (entry.attempts - 1), MAX_RETRY_DELAY)
+            entry.status = NotificationOutbox.STATUS_PENDING
+            entry.next_attempt_at = now + timedelta(seconds=delay)
+            entry.last_error = result['error']
+            logger.warning(f"Notification {entry.id} failed, retrying in {delay}s")
+        if commit:
+            db.session.commit()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                dispatched = self._dispatch()
+            except Exception:
+                logger.exception("Error dispatching notifications")
+                dispatched = 0
+            if not dispatched:
+                evict_idle_smtp_sessions()
+                self._wakeup.wait(self.poll_interval)
+
+    def _dispatch(self):
+        dispatched = 0
+        while not self._stopping.is_set() and self._slots.acquire(timeout=self.poll_interval):
+            try:
+                entry_ids = self.claim_batch()
+            except Exception:
+                self._slots.release()
+                raise
+            if not entry_ids:
+                self._slots.release()
+                break
+            self._executor.submit(self._deliver_in_slot, entry_ids)
+            dispatched += 1
+        return dispatched
+
+    def _deliver_in_slot(self, entry_ids):
+        try:
+            self.deliver_batch(entry_ids)
+        except Exception:
+            logger.exception(f"Error delivering notifications {entry_ids}")
+        finally:
+            self._slots.release()
+
+def init_notification_worker(app):
+    """Create the app's notification worker from environment settings."""
+    default_mode = MODE_AFTER_RESPONSE if os.getenv('VERCEL') else MODE_THREAD
+    mode = os.getenv('NOTIFICATION_MODE', default_mode)
+    digest_enabled = os.getenv('NOTIFICATION_DIGEST', 'false').lower() == 'true'
+
+    worker = NotificationWorker(
+        app,
+        mode=mode,
+        max_workers=int(os.getenv('NOTIFICATION_WORKERS', 2)),
+        poll_interval=float(os.getenv('NOTIFICATION_POLL_INTERVAL', 5)),
+        max_attempts=int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', 5)),
+        retry_backoff=int(os.getenv('NOTIFICATION_RETRY_BACKOFF', 30)),
+        digest_window=float(os.getenv('NOTIFICATION_DIGEST_WINDOW', 60)) if digest_enabled else None,
+        digest_max=int(os.getenv('NOTIFICATION_DIGEST_MAX', 100))
+    )
+    app.extensions['notification_worker'] = worker
+
+    if mode == MODE_THREAD:
+        worker.start()
+    return worker
+
+def dispatch_notifications(count=1):
+    """Hand `count` newly committed outbox entries to the configured delivery path.
+
+    In after_response mode at most `count` due entries are sent once the
+    response is out, so one request never works off the whole backlog of a
+    serverless invocation; older entries are picked up by later requests.
+    """
+    worker = current_app.extensions.get('notification_worker')
+    if worker is None:
+        return False
+
+    if worker.mode == MODE_THREAD:
+        worker.wake()
+    elif worker.mode == MODE_AFTER_RESPONSE:
+        @after_this_request
+        def drain_after_response(response):
+            response.call_on_close(lambda: worker.drain(limit=count))
+            return response
+    return True
+
+def main():
+    """Run the notification worker as a standalone process."""
+    os.environ['NOTIFICATION_MODE'] = MODE_PROCESS
+
+    from app import create_app
+    app = create_app()
+    worker = app.extensions['notification_worker']
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopped.set())
+
+    worker.start()
+    stopped.wait()
+    worker.shutdown()
+
+if __name__ == '__main__':
+    main()
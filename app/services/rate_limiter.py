@@ -0,0 +1,318 @@
+"""
+Per-client rate limiting using the generic cell rate algorithm (GCRA).
+
+GCRA keeps a single number per client, the theoretical arrival time (TAT) of
+its next request, and does constant work per check. Clients may burst up to
+`limit` requests, after which one request is allowed every `period / limit`
+seconds.
+
+Where that state lives is pluggable (RATE_LIMIT_BACKEND):
+- memory: per-process, LRU-bounded by `max_keys` (default)
+- sqlite: a WAL-mode SQLite file shared by every worker process on the host
+- redis: any server speaking the Redis protocol, shared across hosts
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlparse
+
+from flask import jsonify, request
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUESTS = int(os.getenv('RATE_LIMIT_MAX_REQUESTS', 5))  # Maximum 5 requests
+RATE_LIMIT_WINDOW = int(os.getenv('RATE_LIMIT_WINDOW', 60))  # per minute (60 seconds)
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 50000))
+
+class MemoryBackend:
+    """Process-local GCRA state with LRU-bounded memory."""
+
+    def __init__(self, max_keys=RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._tats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tats)
+
+    def gcra(self, key, now, emission_interval, period):
+        with self._lock:
+            tats = self._tats
+            tat = tats.get(key)
+            if tat is None or tat < now:
+                tat = now
+
+            new_tat = tat + emission_interval
+            allow_at = new_tat - period
+            if now < allow_at:
+                return False, allow_at - now
+
+            tats[key] = new_tat
+            tats.move_to_end(key)
+
+            # State older than `now` is equivalent to no state at all
+            for _ in range(2):
+                oldest_key, oldest_tat = next(iter(tats.items()))
+                if oldest_tat > now or oldest_key == key:
+                    break
+                del tats[oldest_key]
+
+            if len(tats) > self.max_keys:
+                tats.popitem(last=False)
+            return True, 0
+
+    def reset(self):
+        with self._lock:
+            self._tats.clear()
+
+class SQLiteBackend:
+    """GCRA state in a WAL-mode SQLite file shared by all processes on a host.
+
+    Each check is a single UPSERT ... RETURNING statement, so it is atomic
+    without an explicit transaction. Expired rows are purged every
+    `purge_every` checks.
+    """
+
+    def __init__(self, path, purge_every=1000):
+        self.path = path
+        self.purge_every = purge_every
+        self._local = threading.local()
+
+    def _connection(self):
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is None or local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None,
+                                   check_same_thread=False)
+            # Limiter state is disposable, so skip fsyncs on the hot path
+            conn.execute('PRAGMA synchronous=OFF')
+            self._initialize(conn)
+            local.conn = conn
+            local.pid = os.getpid()
+            local.hits = 0
+        return conn
+
+    @staticmethod
+    def _initialize(conn, attempts=20):
+        # Switching to WAL needs a brief exclusive lock, which workers starting
+        # at the same time can contend for without invoking the busy handler
+        for attempt in range(attempts):
+            try:
+                if conn.execute('PRAGMA journal_mode').fetchone()[0].lower() != 'wal':
+                    conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('CREATE TABLE IF NOT EXISTS rate_limit (key TEXT PRIMARY KEY, tat REAL NOT NULL)')
+                return
+            except sqlite3.OperationalError:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(0.01 * (attempt + 1))
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM rate_limit').fetchone()[0]
+
+    def gcra(self, key, now, emission_interval, period):
+        conn = self._connection()
+        row = conn.execute(
+            """
+            INSERT INTO rate_limit (key, tat) VALUES (:key, :now + :interval)
+            ON CONFLICT (key) DO UPDATE SET tat = max(tat, :now) + :interval
+            WHERE max(tat, :now) + :interval - :period <= :now
+            RETURNING tat
+            """,
+            {'key': key, 'now': now, 'interval': emission_interval, 'period': period}
+        ).fetchone()
+
+        local = self._local
+        local.hits += 1
+        if local.hits % self.purge_every == 0:
+            conn.execute('DELETE FROM rate_limit WHERE tat < ?', (now,))
+
+        if row is not None:
+            return True, 0
+        tat = conn.execute('SELECT tat FROM rate_limit WHERE key = ?', (key,)).fetchone()
+        retry_after = (max(tat[0], now) + emission_interval - period - now) if tat else 0
+        return False, max(retry_after, 0)
+
+    def reset(self):
+        self._connection().execute('DELETE FROM rate_limit')
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+class RedisBackend:
+    """GCRA state on a Redis-protocol server, evaluated atomically with a Lua script.
+
+    Speaks RESP directly over a socket so no client library is required.
+    """
+
+    SCRIPT = """
+local tat = tonumber(redis.call('GET', KEYS[1]))
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local period = tonumber(ARGV[3])
+if not tat or tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then return {0, tostring(allow_at - now)} end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+    def __init__(self, url='redis://localhost:6379/0', timeout=0.5, key_prefix='ratelimit:'):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+        self._local = threading.local()
+        self._sha = None
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'sock', None) is None or local.pid != os.getpid():
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            local.sock = sock
+            local.reader = sock.makefile('rb')
+            local.pid = os.getpid()
+            if self.password:
+                self._call('AUTH', self.password)
+            if self.db:
+                self._call('SELECT', self.db)
+        return local
+
+    def _call(self, *args):
+        local = self._connection()
+        parts = [f'*{len(args)}\r\n'.encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        try:
+            local.sock.sendall(b''.join(parts))
+            return self._read_reply(local.reader)
+        except (OSError, ConnectionError):
+            self._disconnect()
+            raise
+
+    def _disconnect(self):
+        local = self._local
+        sock = getattr(local, 'sock', None)
+        local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by Redis server")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b'+':
+            return payload.decode()
+        if prefix == b'-':
+            raise RedisError(payload.decode())
+        if prefix == b':':
+            return int(payload)
+        if prefix == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2].decode()
+        if prefix == b'*':
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self._read_reply(reader) for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def execute(self, *args):
+        """Run one command and return its decoded reply."""
+        return self._call(*args)
+
+    def gcra(self, key, now, emission_interval, period):
+        args = (1, self.key_prefix + key, repr(now), repr(emission_interval), repr(period))
+        if self._sha is None:
+            self._sha = self._call('SCRIPT', 'LOAD', self.SCRIPT)
+        try:
+            allowed, retry_after = self._call('EVALSHA', self._sha, *args)
+        except RedisError as e:
+            if not str(e).startswith('NOSCRIPT'):
+                raise
+            allowed, retry_after = self._call('EVAL', self.SCRIPT, *args)
+        return bool(int(allowed)), float(retry_after)
+
+    def reset(self):
+        cursor = '0'
+        while True:
+            cursor, keys = self._call('SCAN', cursor, 'MATCH', self.key_prefix + '*', 'COUNT', 1000)
+            if keys:
+                self._call('DEL', *keys)
+            if cursor == '0':
+                break
+
+class GCRARateLimiter:
+    """GCRA limiter over a pluggable state backend."""
+
+    def __init__(self, limit=MAX_REQUESTS, period=RATE_LIMIT_WINDOW, backend=None, clock=time.time):
+        self.limit = limit
+        self.period = period
+        self.emission_interval = period / limit
+        self.backend = backend if backend is not None else MemoryBackend()
+        # Wall-clock time so that state is comparable across processes
+        self.clock = clock
+
+    def hit(self, key):
+        """Record a request for `key`.
+
+        Returns an (allowed, retry_after) pair; retry_after is 0 when allowed.
+        If the backend is unreachable the request is allowed rather than
+        blocking contact submissions.
+        """
+        try:
+            return self.backend.gcra(key, self.clock(), self.emission_interval, self.period)
+        except Exception as e:
+            logger.warning(f"Rate limiter backend error, allowing request: {e}")
+            return True, 0
+
+    def reset(self):
+        """Forget all clients."""
+        self.backend.reset()
+
+def create_backend():
+    """Build the limiter backend selected by RATE_LIMIT_BACKEND."""
+    backend = os.getenv('RATE_LIMIT_BACKEND', 'memory').lower()
+    if backend == 'sqlite':
+        path = os.getenv('RATE_LIMIT_SQLITE_PATH',
+                         os.path.join(tempfile.gettempdir(), 'thor-signia-ratelimit.sqlite3'))
+        return SQLiteBackend(path)
+    if backend == 'redis':
+        return RedisBackend(os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0'))
+    if backend != 'memory':
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND '{backend}', using memory")
+    return MemoryBackend()
+
+limiter = GCRARateLimiter(backend=create_backend())
+
+def rate_limit(f):
+    """Reject requests from clients that exceed the configured rate."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        allowed, retry_after = limiter.hit(request.remote_addr)
+        if not allowed:
+            response = jsonify({"error": "Rate limit exceeded. Please try again later."})
+            response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+            return response, 429
+        return f(*args, **kwargs)
+    return decorated_function
@@ -0,0 +1,179 @@
+"""
+Pooled, authenticated SMTP sessions.
+
+Opening a session costs a TCP connect, a TLS handshake and an AUTH round trip.
+The pool keeps a small number of logged-in sessions around so consecutive
+notifications can reuse them. Idle sessions are probed with NOOP before reuse,
+evicted after `idle_timeout` and transparently reopened when the server has
+dropped them.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class SMTPConnectionPool:
+    """Thread-safe pool of authenticated SMTP sessions."""
+
+    def __init__(self, host, port, user, password, use_ssl=False, starttls=True,
+                 timeout=10, max_connections=2, idle_timeout=60, keepalive_interval=15,
+                 connection_factory=None):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.connection_factory = connection_factory or self._default_factory
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._idle = []  # (session, last_used) pairs, most recently used last
+
+    def _default_factory(self):
+        import smtplib
+        if self.use_ssl:
+            return smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            server.starttls()
+        return server
+
+    def _open(self):
+        server = self.connection_factory()
+        try:
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        logger.info(f"Opened SMTP session to {self.host}:{self.port}")
+        return server
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_reusable_after(error):
+        import smtplib
+        # The server answered, so the session itself is still healthy
+        return (isinstance(error, smtplib.SMTPException)
+                and not isinstance(error, smtplib.SMTPServerDisconnected))
+
+    @staticmethod
+    def _is_alive(server):
+        try:
+            return server.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self):
+        """Return a reusable idle session or open a new one. Caller holds a slot."""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, last_used = self._idle.pop()
+            idle_for = now - last_used
+            if idle_for > self.idle_timeout:
+                self._close(server)
+                continue
+            if idle_for > self.keepalive_interval and not self._is_alive(server):
+                self._close(server)
+                continue
+            return server
+        return self._open()
+
+    def _checkin(self, server):
+        with self._lock:
+            self._idle.append((server, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        """Borrow an authenticated session for the duration of the block."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("Timed out waiting for an SMTP session")
+        server = None
+        try:
+            server = self._checkout()
+            yield server
+        except Exception as e:
+            if server is not None and not self._is_reusable_after(e):
+                self._close(server)
+                server = None
+            raise
+        finally:
+            if server is not None:
+                self._checkin(server)
+            self._slots.release()
+
+    def send_message(self, msg):
+        """Send a message, reconnecting once if a pooled session went stale."""
+        import smtplib
+        try:
+            with self.connection() as server:
+                return server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            logger.info("Pooled SMTP session was disconnected, reconnecting")
+            with self.connection() as server:
+                return server.send_message(msg)
+
+    def evict_idle(self):
+        """Close sessions that have been idle longer than `idle_timeout`."""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [server for server, last_used in self._idle if last_used < cutoff]
+            self._idle = [(server, last_used) for server, last_used in self._idle
+                          if last_used >= cutoff]
+        for server in expired:
+            self._close(server)
+        return len(expired)
+
+    def close(self):
+        """Close every idle session."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_smtp_pool(host, port, user, password, use_ssl=False, starttls=True, **options):
+    """Return the shared pool for these SMTP settings, creating it on first use."""
+    key = (host, port, user, password, use_ssl, starttls)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SMTPConnectionPool(host, port, user, password, use_ssl=use_ssl,
+                                      starttls=starttls, **options)
+            _pools[key] = pool
+        return pool
+
+def evict_idle_smtp_sessions():
+    """Close expired idle sessions in every shared pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return sum(pool.evict_idle() for pool in pools)
+
+def close_smtp_pools():
+    """Close the idle sessions of every shared pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
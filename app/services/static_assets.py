@@ -0,0 +1,160 @@
+"""
+Static serving of the built frontend (dist/).
+
+The directory is scanned once at startup into a manifest, so a request is a
+dict lookup rather than a filesystem probe:
+
+- precompressed `.br` / `.gz` siblings (see precompress_static.py) are served
+  when the client's Accept-Encoding allows, with Vary: Accept-Encoding
+- fingerprinted Vite assets (assets/<name>-<hash>.<ext>) are cached for a
+  year as immutable; everything else revalidates with its ETag
+- index.html, and its variants, are held in memory and answer every path
+  that is not a file, for client-side routing
+
+Files added to dist/ after startup are not served until the next start.
+"""
+
+import logging
+import mimetypes
+import os
+import re
+
+from flask import Response, request, send_file
+
+logger = logging.getLogger(__name__)
+
+# Vite names hashed output assets/[name]-[hash].[ext], the hash being 8 base64url
+# characters (assets/index-4f3a9c1b.js, assets/vendor-BXk3w2dA.css). A hash has a
+# digit or capital letter, which tells it apart from the last word of an unhashed
+# name like assets/logo-dark-inverted.svg; the rare all-lowercase hash revalidates.
+FINGERPRINT_PATTERN = re.compile(r'^assets/[^/]+-(?=[a-z_-]*[A-Z0-9])[A-Za-z0-9_-]{8}\.\w+$')
+
+# Preferred first when the client accepts both
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+class StaticAsset:
+    """One servable file and its precompressed variants."""
+
+    __slots__ = ('path', 'mimetype', 'etag', 'mtime', 'cache_control', 'variants')
+
+    def __init__(self, path, mimetype, etag, mtime, cache_control, variants):
+        self.path = path
+        self.mimetype = mimetype
+        self.etag = etag
+        self.mtime = mtime
+        self.cache_control = cache_control
+        self.variants = variants  # encoding -> file path
+
+class StaticManifest:
+    """Startup index of the files under a build directory."""
+
+    def __init__(self, root):
+        self.root = root
+        self.assets = {}
+        self.index = None           # StaticAsset for index.html
+        self.index_bodies = {}      # encoding (None for identity) -> bytes
+        self.scan()
+
+    def scan(self):
+        """(Re)build the manifest from the files on disk."""
+        assets = {}
+        if os.path.isdir(self.root):
+            for directory, _, files in os.walk(self.root):
+                names = set(files)
+                for name in files:
+                    if any(name.endswith(suffix) and name[:-len(suffix)] in names for _, suffix in ENCODINGS):
+                        continue  # a variant, registered with its original
+                    path = os.path.join(directory, name)
+                    url_path = os.path.relpath(path, self.root).replace(os.sep, '/')
+                    assets[url_path] = self._asset(url_path, path, names, name)
+        self.assets = assets
+
+        self.index = assets.get('index.html')
+        self.index_bodies = {}
+        if self.index is not None:
+            with open(self.index.path, 'rb') as f:
+                self.index_bodies[None] = f.read()
+            for encoding, path in self.index.variants.items():
+                with open(path, 'rb') as f:
+                    self.index_bodies[encoding] = f.read()
+        else:
+            logger.warning(f"No index.html in {self.root}; run `npm run build` to serve the frontend")
+
+        logger.info(f"Static manifest: {len(assets)} files in {self.root}")
+
+    @staticmethod
+    def _asset(url_path, path, names, name):
+        stat = os.stat(path)
+        variants = {
+            encoding: os.path.join(os.path.dirname(path), name + suffix)
+            for encoding, suffix in ENCODINGS
+            if name + suffix in names
+        }
+        fingerprinted = FINGERPRINT_PATTERN.match(url_path) is not None
+        return StaticAsset(
+            path=path,
+            mimetype=mimetypes.guess_type(name)[0] or 'application/octet-stream',
+            etag=f'{stat.st_size:x}-{stat.st_mtime_ns:x}',
+            mtime=stat.st_mtime,
+            cache_control=IMMUTABLE if fingerprinted else REVALIDATE,
+            variants=variants
+        )
+
+    @staticmethod
+    def negotiate(asset):
+        """The best precompressed variant the client accepts, or (None, asset.path)."""
+        if asset.variants:
+            accepted = request.accept_encodings
+            for encoding, _ in ENCODINGS:
+                path = asset.variants.get(encoding)
+                if path is not None and accepted[encoding]:
+                    return encoding, path
+        return None, asset.path
+
+    def serve(self, url_path):
+        """Response for `url_path`: the file, or index.html for client-side routes."""
+        asset = self.assets.get(url_path)
+        if asset is None or url_path == 'index.html':
+            return self.serve_index()
+
+        encoding, path = self.negotiate(asset)
+        response = send_file(
+            path,
+            mimetype=asset.mimetype,
+            etag=f'{asset.etag}-{encoding}' if encoding else asset.etag,
+            last_modified=asset.mtime,
+            max_age=None,
+            conditional=True
+        )
+        return self._finish(response, asset, encoding)
+
+    def serve_index(self):
+        """index.html from memory, for / and every unknown path."""
+        asset = self.index
+        if asset is None:
+            return Response('Frontend not built', status=404, mimetype='text/plain')
+
+        encoding, _ = self.negotiate(asset)
+        response = Response(self.index_bodies[encoding], mimetype=asset.mimetype)
+        response.set_etag(f'{asset.etag}-{encoding}' if encoding else asset.etag)
+        response.last_modified = asset.mtime
+        response.make_conditional(request)
+        return self._finish(response, asset, encoding)
+
+    @staticmethod
+    def _finish(response, asset, encoding):
+        response.headers['Cache-Control'] = asset.cache_control
+        if asset.variants:
+            response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+def init_static_assets(app, root):
+    """Build the manifest of the frontend build in `root` and register it on the app."""
+    manifest = StaticManifest(root)
+    app.extensions['static_manifest'] = manifest
+    return manifest
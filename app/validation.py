@@ -0,0 +1,129 @@
+"""
+Single-pass validation and normalization of contact submissions.
+
+Routes validate a payload once with `normalize_contact` (or many with
+`normalize_contacts`) and hand the resulting values to storage as-is; the
+`Contact` model trusts them instead of validating again. All patterns are
+compiled once at import time.
+"""
+
+import re
+
+MAX_LENGTHS = {
+    'name': 100,
+    'email': 120,
+    'phone': 20,
+    'company': 100,
+    'message': 2000,
+}
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+# Characters stripped from every text field; a compiled sub beats str.translate
+# for deletions
+UNSAFE_PATTERN = re.compile(r'[<>\'";]')
+
+PHONE_DISALLOWED = re.compile(r'[^\d\s\+\-\(\)]')
+
+def is_valid_email(email):
+    """Whether `email` is a plausible address (a single trailing newline is tolerated)."""
+    if email.endswith('\n'):
+        email = email[:-1]
+    return EMAIL_PATTERN.fullmatch(email) is not None
+
+def clean_text(value, field, label):
+    """Strip, truncate and sanitize a required text field, raising ValueError if invalid."""
+    if not value or not isinstance(value, str):
+        raise ValueError(f"{label} is required and must be a string")
+    value = UNSAFE_PATTERN.sub('', value.strip()[:MAX_LENGTHS[field]])
+    if not value:
+        raise ValueError(f"{label} cannot be empty after sanitization")
+    return value
+
+def clean_email(value):
+    """Strip, truncate and check an email address, raising ValueError if invalid."""
+    if not value or not isinstance(value, str):
+        raise ValueError("Email is required and must be a string")
+    value = UNSAFE_PATTERN.sub('', value.strip()[:MAX_LENGTHS['email']])
+    if not is_valid_email(value):
+        raise ValueError("Invalid email format")
+    return value
+
+def clean_phone(value):
+    """Normalize an optional phone number; returns None when absent."""
+    if not value:
+        return None
+    if not isinstance(value, str):
+        raise ValueError("Phone must be a string")
+    return PHONE_DISALLOWED.sub('', value.strip()[:MAX_LENGTHS['phone']])
+
+def normalize_contact(data):
+    """Validate and normalize one submission in a single pass.
+
+    Returns a (values, error) pair; values are ready to store when error is None.
+    """
+    if not isinstance(data, dict):
+        return None, "Invalid contact data"
+
+    get = data.get
+    name, email, phone, company, message = (
+        get('name'), get('email'), get('phone'), get('company'), get('message')
+    )
+
+    for field, value in (('name', name), ('email', email), ('company', company), ('message', message)):
+        if not value:
+            return None, f"Missing required field: {field}"
+    for field, value in (('name', name), ('email', email), ('company', company),
+                         ('message', message), ('phone', phone)):
+        if value and not isinstance(value, str):
+            return None, f"Invalid value for field: {field}"
+
+    if not is_valid_email(email):
+        return None, "Invalid email format"
+
+    strip_unsafe = UNSAFE_PATTERN.sub
+    name = strip_unsafe('', name)
+    phone = strip_unsafe('', phone) if phone else ''
+    company = strip_unsafe('', company)
+    message = strip_unsafe('', message)
+
+    # A valid address has no unsafe characters, so it is already sanitized
+    if len(name) > 100:
+        return None, "Name is too long (max 100 characters)"
+    if len(email) > 120:
+        return None, "Email is too long (max 120 characters)"
+    if len(phone) > 20:
+        return None, "Phone number is too long (max 20 characters)"
+    if len(company) > 100:
+        return None, "Company name is too long (max 100 characters)"
+    if len(message) > 2000:
+        return None, "Message is too long (max 2000 characters)"
+
+    if not name:
+        return None, "Name is required and must be a string"
+    name = name.strip()
+    if not name:
+        return None, "Name cannot be empty after sanitization"
+    if not company:
+        return None, "Company is required and must be a string"
+    company = company.strip()
+    if not company:
+        return None, "Company cannot be empty after sanitization"
+    if not message:
+        return None, "Message is required and must be a string"
+    message = message.strip()
+    if not message:
+        return None, "Message cannot be empty after sanitization"
+
+    return {
+        'name': name,
+        'email': email.strip(),
+        'phone': PHONE_DISALLOWED.sub('', phone.strip()) if phone else None,
+        'company': company,
+        'message': message
+    }, None
+
+def normalize_contacts(payloads):
+    """Validate many submissions; returns one (values, error) pair per payload."""
+    normalize = normalize_contact
+    return [normalize(data) for data in payloads]
@@ -0,0 +1,111 @@
+"""
+Cold-start benchmark for the Vercel entry point (api/index.py).
+
+Imports the entry point in fresh interpreters with `python -X importtime`,
+as a new serverless instance would, and fails if startup regresses:
+- the median cumulative import time of api.index exceeds the budget
+- a module that should load lazily (email stack, dotenv) is imported
+- a database connection is opened before the first request
+
+Usage:
+    python benchmark_cold_start.py [--runs 5] [--budget-ms 800]
+        [--database-url sqlite:////tmp/cold-start.db]
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s]: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Only needed once a request actually uses them
+LAZY_MODULES = ('smtplib', 'email.mime.multipart', 'email.mime.text', 'dotenv')
+
+PROBE = """
+import json
+import api.index
+from app.services.engine_profile import pool_metrics
+print(json.dumps({'connections': pool_metrics.connections_opened}))
+"""
+
+def parse_importtime(stderr):
+    """Map each imported module to its cumulative import time in ms."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative) / 1000
+    return modules
+
+def cold_start(database_url):
+    """Start one fresh interpreter; returns (probe result, import times, wall ms)."""
+    env = dict(os.environ, VERCEL='1', DATABASE_URL=database_url, PYTHONPATH=ROOT)
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    wall = (time.perf_counter() - started) * 1000
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    return probe, parse_importtime(result.stderr), wall
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serverless cold starts')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('COLD_START_BUDGET_MS', 800)),
+                        help='Maximum median import time of api.index')
+    parser.add_argument('--database-url', default=None,
+                        help='Database URL (defaults to a throwaway SQLite file)')
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'cold-start.db')}"
+
+    # Warm-up run so bytecode compilation is not counted
+    cold_start(database_url)
+
+    import_times, walls, failures = [], [], []
+    for run in range(args.runs):
+        probe, modules, wall = cold_start(database_url)
+        import_times.append(modules['api.index'])
+        walls.append(wall)
+        logger.info(f"Run {run + 1}: api.index {modules['api.index']:.1f} ms, "
+                    f"process {wall:.1f} ms, {probe['connections']} DB connections")
+
+        eager = [name for name in LAZY_MODULES if name in modules]
+        if eager:
+            failures.append(f"Imported at startup: {', '.join(eager)}")
+        if probe['connections']:
+            failures.append(f"Opened {probe['connections']} database connections at startup")
+
+    top = sorted(((ms, name) for name, ms in modules.items() if name.startswith('app.')), reverse=True)[:5]
+    logger.info("Heaviest app modules: " + ', '.join(f"{name} {ms:.1f} ms" for ms, name in top))
+
+    median = statistics.median(import_times)
+    logger.info(f"Median: api.index {median:.1f} ms (budget {args.budget_ms:.0f} ms), "
+                f"process {statistics.median(walls):.1f} ms")
+    if median > args.budget_ms:
+        failures.append(f"Median import time {median:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+
+    for failure in sorted(set(failures)):
+        logger.error(failure)
+    if failures:
+        sys.exit(1)
+    logger.info("Cold start is within budget")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark for API response compression.
+
+Builds synthetic contact payloads shaped like the API's responses (a 50-item
+page as from GET /api/contacts?limit=50, and a streamed NDJSON export) with
+messages of up to 2000 characters, and compresses them with the codecs the
+compression middleware uses at several levels. Reports, per level, the CPU
+time per MiB of input, the compressed size and ratio, and the time a page
+takes to send on a link of `--bandwidth` Mbit/s, so the CPU spent can be
+weighed against the bytes saved.
+
+Usage:
+    python benchmark_compression.py [--contacts 2000] [--page-size 50]
+        [--bandwidth 20] [--repeat 3]
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.middleware.compression import COMPRESSORS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s]: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+LEVELS = {'gzip': (1, 4, 6, 9), 'br': (1, 4, 6, 9, 11)}
+
+VOCABULARY = [
+    ''.join(random.Random(i).choices('abcdefghijklmnopqrstuvwxyz', k=random.Random(-i).randint(2, 10)))
+    for i in range(3000)
+]
+
+# Word frequencies follow Zipf's law, as in natural text
+WEIGHTS = [1 / rank for rank in range(1, len(VOCABULARY) + 1)]
+
+def generate_contacts(count, seed=0):
+    """Contacts as the API serializes them, with 20-2000 character messages."""
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    contacts = []
+    for i in range(count):
+        words = []
+        limit = rng.randint(20, 2000)
+        length = 0
+        while length < limit:
+            word = rng.choices(VOCABULARY, WEIGHTS)[0]
+            words.append(word)
+            length += len(word) + 1
+        contacts.append({
+            'id': i + 1,
+            'name': f'{rng.choice(VOCABULARY).title()} {rng.choice(VOCABULARY).title()}',
+            'email': f'{rng.choice(VOCABULARY)}{i}@{rng.choice(VOCABULARY)}.com',
+            'phone': f'+91 {rng.randrange(10 ** 9, 10 ** 10)}',
+            'company': f'{rng.choice(VOCABULARY).title()} Ltd',
+            'message': ' '.join(words)[:2000],
+            'created_at': (started + timedelta(minutes=i)).isoformat()
+        })
+    return contacts
+
+def measure(encoding, level, chunks, repeat):
+    """(CPU seconds per pass, compressed bytes) for compressing `chunks` as one stream."""
+    best = None
+    for _ in range(repeat):
+        started = time.process_time()
+        compress, finish = COMPRESSORS[encoding](level)
+        size = sum(len(compress(chunk)) for chunk in chunks) + len(finish())
+        elapsed = time.process_time() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, size
+
+def report(name, chunks, bandwidth, repeat):
+    raw = sum(len(chunk) for chunk in chunks)
+    bytes_per_second = bandwidth * 1e6 / 8
+    logger.info(f"{name}: {raw / 1024:.1f} KiB uncompressed, "
+                f"{raw / bytes_per_second * 1000:.1f} ms to send at {bandwidth} Mbit/s")
+    for encoding in COMPRESSORS:
+        for level in LEVELS[encoding]:
+            cpu, size = measure(encoding, level, chunks, repeat)
+            logger.info(f"  {encoding:>4} {level:>2}: {cpu / (raw / 2 ** 20) * 1000:7.1f} ms CPU/MiB, "
+                        f"{size / 1024:8.1f} KiB ({raw / size:4.1f}x), "
+                        f"{cpu * 1000:7.2f} ms CPU + {size / bytes_per_second * 1000:7.1f} ms to send")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API response compression levels')
+    parser.add_argument('--contacts', type=int, default=2000, help='Contacts in the export')
+    parser.add_argument('--page-size', type=int, default=50, help='Contacts in one list page')
+    parser.add_argument('--bandwidth', type=float, default=20, help='Client link in Mbit/s')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per level; the fastest counts')
+    args = parser.parse_args()
+
+    if 'br' not in COMPRESSORS:
+        logger.warning("brotli is not installed; measuring gzip only")
+
+    contacts = generate_contacts(args.contacts)
+
+    page = json.dumps({'items': contacts[:args.page_size], 'next_cursor': 'x' * 24}).encode('utf-8')
+    report(f"List page ({args.page_size} contacts)", [page], args.bandwidth, args.repeat)
+
+    # One chunk per row, as export_rows_as_ndjson yields them, so the cost of
+    # compressing a stream piece by piece is included
+    chunks = [(json.dumps(contact) + '\n').encode('utf-8') for contact in contacts]
+    report(f"NDJSON export ({args.contacts} contacts)", chunks, args.bandwidth, args.repeat)
+
+if __name__ == '__main__':
+    main()
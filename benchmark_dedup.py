@@ -0,0 +1,117 @@
+"""
+Benchmark for the submission deduplicator.
+
+Replays a synthetic stream of contact submissions through the exact and
+near-duplicate index: mostly new messages, plus exact resubmissions
+(double-clicks) and lightly edited replays (bots). Reports the cost of one
+lookup per submission for several message lengths, the throughput with
+concurrent threads, the hit rates, and the index's memory once it holds
+`max_entries` submissions.
+
+Usage:
+    python benchmark_dedup.py [--submissions 50000] [--threads 8]
+        [--max-entries 10000]
+"""
+
+import argparse
+import logging
+import random
+import threading
+import time
+import tracemalloc
+
+from app.services.dedup import SubmissionDeduplicator
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s]: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+VOCABULARY = [f'word{i}' for i in range(5000)]
+
+def generate_submissions(count, words, seed=0):
+    """New submissions with ~10% exact repeats and ~10% edited replays."""
+    rng = random.Random(seed)
+    submissions = []
+    for i in range(count):
+        roll = rng.random()
+        if submissions and roll < 0.1:
+            submissions.append(dict(rng.choice(submissions)))
+        elif submissions and roll < 0.2:
+            replay = dict(rng.choice(submissions))
+            message = replay['message'].split()
+            message[rng.randrange(len(message))] = rng.choice(VOCABULARY)
+            replay['message'] = ' '.join(message)
+            submissions.append(replay)
+        else:
+            submissions.append({
+                'email': f'user{rng.randrange(count)}@example.com',
+                'company': f'Company {rng.randrange(1000)}',
+                'message': ' '.join(rng.choices(VOCABULARY, k=words))
+            })
+    return submissions
+
+def replay(dedup, submissions):
+    """Claim every submission, completing new ones as if they were stored."""
+    for contact_id, values in enumerate(submissions):
+        kind, claim = dedup.claim(values)
+        if kind is None:
+            dedup.complete(claim, contact_id)
+
+def measure_lookup(submissions, max_entries):
+    """Average cost of one claim on a single thread, in microseconds."""
+    dedup = SubmissionDeduplicator(max_entries=max_entries)
+    started = time.perf_counter()
+    replay(dedup, submissions)
+    elapsed = time.perf_counter() - started
+    return elapsed / len(submissions) * 1e6, dedup.stats()
+
+def measure_concurrent(submissions, threads, max_entries):
+    """Throughput with `threads` request threads sharing one index."""
+    dedup = SubmissionDeduplicator(max_entries=max_entries)
+    shares = [submissions[i::threads] for i in range(threads)]
+    workers = [threading.Thread(target=replay, args=(dedup, share)) for share in shares]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return len(submissions) / (time.perf_counter() - started)
+
+def measure_memory(max_entries, words):
+    """Bytes held by an index filled to `max_entries` distinct submissions."""
+    submissions = generate_submissions(max_entries * 2, words, seed=1)
+    tracemalloc.start()
+    dedup = SubmissionDeduplicator(max_entries=max_entries)
+    replay(dedup, submissions)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, len(dedup)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the submission deduplicator')
+    parser.add_argument('--submissions', type=int, default=50000, help='Submissions per run')
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent request threads')
+    parser.add_argument('--max-entries', type=int, default=10000, help='Index capacity')
+    args = parser.parse_args()
+
+    for words in (5, 30, 100, 300):
+        submissions = generate_submissions(args.submissions, words)
+        per_lookup, stats = measure_lookup(submissions, args.max_entries)
+        logger.info(f"{words:>3} words: {per_lookup:.1f} us per submission, "
+                    f"{stats['exact_hits']} exact and {stats['near_hits']} near duplicates "
+                    f"of {args.submissions}")
+
+    submissions = generate_submissions(args.submissions, 30)
+    throughput = measure_concurrent(submissions, args.threads, args.max_entries)
+    logger.info(f"{args.threads} threads, 30 words: {throughput:,.0f} submissions/s")
+
+    memory, entries = measure_memory(args.max_entries, 30)
+    logger.info(f"Memory with {entries} entries: {memory / 1024 / 1024:.1f} MiB "
+                f"({memory / entries:.0f} bytes per entry)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark for the GCRA rate limiter.
+
+Feeds a stream of distinct client IPs through the in-memory limiter and
+reports its memory at regular checkpoints. Memory should stop growing once
+`max_keys` clients are tracked, however many IPs are seen. The per-check cost
+of the hot path is then measured for the selected backend.
+
+Usage:
+    python benchmark_rate_limiter.py [--ips 1000000] [--max-keys 50000]
+        [--backend memory|sqlite|redis]
+"""
+
+import argparse
+import ipaddress
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from app.services.rate_limiter import GCRARateLimiter, MemoryBackend, RedisBackend, SQLiteBackend
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s]: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+def create_backend(name):
+    """Build a fresh backend for the hot-path measurement."""
+    if name == 'sqlite':
+        path = os.path.join(tempfile.mkdtemp(), 'ratelimit.sqlite3')
+        return SQLiteBackend(path)
+    if name == 'redis':
+        return RedisBackend(os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0'))
+    return MemoryBackend()
+
+def measure_hot_path(backend, count=100000):
+    """Average cost of one limiter check against the given backend."""
+    limiter = GCRARateLimiter(limit=5, period=60, backend=backend)
+    base = int(ipaddress.IPv4Address('10.0.0.0'))
+    keys = [str(ipaddress.IPv4Address(base + i % 20000)) for i in range(count)]
+    limiter.reset()
+    started = time.perf_counter()
+    for key in keys:
+        limiter.hit(key)
+    return (time.perf_counter() - started) / count
+
+def run_benchmark(total_ips, max_keys, checkpoints=10):
+    """Hit the limiter once per distinct IP and sample memory along the way."""
+    backend = MemoryBackend(max_keys=max_keys)
+    limiter = GCRARateLimiter(limit=5, period=60, backend=backend)
+    base = int(ipaddress.IPv4Address('10.0.0.0'))
+    step = max(1, total_ips // checkpoints)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    samples = []
+
+    started = time.perf_counter()
+    for i in range(total_ips):
+        limiter.hit(str(ipaddress.IPv4Address(base + i)))
+        if (i + 1) % step == 0:
+            current = tracemalloc.get_traced_memory()[0] - baseline
+            samples.append((i + 1, len(backend), current))
+            logger.info(f"{i + 1:>9} IPs seen: {len(backend):>7} tracked, {current / 1024 / 1024:7.2f} MiB")
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+
+    logger.info(f"Processed {total_ips} IPs in {elapsed:.2f}s (with tracemalloc)")
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the GCRA rate limiter')
+    parser.add_argument('--ips', type=int, default=1000000, help='Number of distinct client IPs')
+    parser.add_argument('--max-keys', type=int, default=50000, help='Limiter key capacity')
+    parser.add_argument('--backend', choices=['memory', 'sqlite', 'redis'], default='memory',
+                        help='Backend used for the hot-path measurement')
+    args = parser.parse_args()
+
+    per_check = measure_hot_path(create_backend(args.backend))
+    logger.info(f"Hot path ({args.backend}): {per_check * 1e6:.2f} µs per check")
+
+    samples = run_benchmark(args.ips, args.max_keys)
+
+    # Memory must plateau once the key cap is reached
+    capped = [memory for seen, tracked, memory in samples if seen >= args.max_keys * 2]
+    if len(capped) >= 2 and capped[-1] > capped[0] * 1.1:
+        logger.error("Limiter memory kept growing after reaching its key cap")
+        sys.exit(1)
+    logger.info("Limiter memory stayed flat")
+
+if __name__ == '__main__':
+    main()
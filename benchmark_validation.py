@@ -0,0 +1,177 @@
+"""
+Benchmark for contact validation.
+
+Compares the single-pass validator in app/validation.py with the previous
+two-stage pipeline (route sanitization followed by the Contact model's own
+validators), which is reproduced below. Both must produce identical results
+for every generated payload before any timing is reported.
+
+Usage:
+    python benchmark_validation.py [--payloads 20000] [--repeat 5]
+"""
+
+import argparse
+import logging
+import random
+import re
+import string
+import sys
+import time
+
+from app.validation import normalize_contacts
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s]: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+# --- Previous implementation, kept verbatim for comparison ---
+
+def legacy_validate_email(email):
+    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(email_pattern, email) is not None
+
+def legacy_sanitize_input(text):
+    if not text:
+        return ""
+    return re.sub(r'[<>\'";]', '', text)
+
+def legacy_model_text(value, max_length, label):
+    if not value or not isinstance(value, str):
+        raise ValueError(f"{label} is required and must be a string")
+    value = value.strip()[:max_length]
+    value = re.sub(r'[<>\'";]', '', value)
+    if not value:
+        raise ValueError(f"{label} cannot be empty after sanitization")
+    return value
+
+def legacy_model_email(email):
+    if not email or not isinstance(email, str):
+        raise ValueError("Email is required and must be a string")
+    email = email.strip()[:120]
+    email = re.sub(r'[<>\'";]', '', email)
+    email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    if not re.match(email_pattern, email):
+        raise ValueError("Invalid email format")
+    return email
+
+def legacy_model_phone(phone):
+    if not phone:
+        return None
+    if not isinstance(phone, str):
+        raise ValueError("Phone must be a string")
+    phone = phone.strip()[:20]
+    phone = re.sub(r'[^\d\s\+\-\(\)]', '', phone)
+    return phone
+
+def legacy_validate(data):
+    if not isinstance(data, dict):
+        return None, "Invalid contact data"
+    required_fields = ['name', 'email', 'company', 'message']
+    for field in required_fields:
+        if not data.get(field):
+            return None, f"Missing required field: {field}"
+    for field in required_fields + ['phone']:
+        if data.get(field) and not isinstance(data[field], str):
+            return None, f"Invalid value for field: {field}"
+    if not legacy_validate_email(data.get('email', '')):
+        return None, "Invalid email format"
+    sanitized_data = {
+        'name': legacy_sanitize_input(data['name']),
+        'email': legacy_sanitize_input(data['email']),
+        'phone': legacy_sanitize_input(data.get('phone', '')),
+        'company': legacy_sanitize_input(data['company']),
+        'message': legacy_sanitize_input(data['message'])
+    }
+    if len(sanitized_data['name']) > 100:
+        return None, "Name is too long (max 100 characters)"
+    if len(sanitized_data['email']) > 120:
+        return None, "Email is too long (max 120 characters)"
+    if len(sanitized_data['phone']) > 20:
+        return None, "Phone number is too long (max 20 characters)"
+    if len(sanitized_data['company']) > 100:
+        return None, "Company name is too long (max 100 characters)"
+    if len(sanitized_data['message']) > 2000:
+        return None, "Message is too long (max 2000 characters)"
+    try:
+        return {
+            'name': legacy_model_text(sanitized_data['name'], 100, 'Name'),
+            'email': legacy_model_email(sanitized_data['email']),
+            'phone': legacy_model_phone(sanitized_data['phone']),
+            'company': legacy_model_text(sanitized_data['company'], 100, 'Company'),
+            'message': legacy_model_text(sanitized_data['message'], 2000, 'Message')
+        }, None
+    except ValueError as e:
+        return None, str(e)
+
+# --- Payload generation ---
+
+NOISE = string.ascii_letters + string.digits + ' <>\'";\n\t()+-.@'
+
+def random_text(rng, length):
+    return ''.join(rng.choice(NOISE) for _ in range(length))
+
+def generate_payloads(count, seed=42):
+    """Mostly realistic submissions mixed with malformed and hostile ones."""
+    rng = random.Random(seed)
+    payloads = []
+    for i in range(count):
+        payload = {
+            'name': f'Person {i}',
+            'email': f'person{i}@example.com',
+            'phone': f'+1 (555) {i % 1000:03d}-0000',
+            'company': f'Company {i % 97}',
+            'message': 'I would like to learn more about your services. ' * rng.randint(1, 10)
+        }
+        roll = rng.random()
+        if roll < 0.3:
+            field = rng.choice(list(payload))
+            payload[field] = random_text(rng, rng.choice([0, 1, 3, 25, 130, 2100]))
+        elif roll < 0.35:
+            payload[rng.choice(list(payload))] = rng.choice([None, 0, 42, [], ['x'], '   ', '<>'])
+        elif roll < 0.4:
+            payload['email'] = rng.choice(['user@example.com\n', ' user@example.com', 'x' * 118 + '@a.io'])
+        payloads.append(payload)
+    return payloads
+
+def time_it(func, repeat):
+    """Best wall time of `repeat` calls."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark contact validation')
+    parser.add_argument('--payloads', type=int, default=20000, help='Number of generated payloads')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    payloads = generate_payloads(args.payloads)
+
+    expected = [legacy_validate(payload) for payload in payloads]
+    actual = normalize_contacts(payloads)
+    mismatches = [i for i, (old, new) in enumerate(zip(expected, actual)) if old != new]
+    if mismatches:
+        for i in mismatches[:5]:
+            logger.error(f"Mismatch for {payloads[i]!r}: {expected[i]!r} != {actual[i]!r}")
+        logger.error(f"{len(mismatches)} of {len(payloads)} payloads validated differently")
+        sys.exit(1)
+    valid = sum(1 for values, error in actual if error is None)
+    logger.info(f"{len(payloads)} payloads ({valid} valid) validate identically")
+
+    legacy = time_it(lambda: [legacy_validate(payload) for payload in payloads], args.repeat)
+    single_pass = time_it(lambda: normalize_contacts(payloads), args.repeat)
+
+    per_legacy = legacy / len(payloads) * 1e6
+    per_single = single_pass / len(payloads) * 1e6
+    logger.info(f"Legacy pipeline: {per_legacy:.2f} µs per payload")
+    logger.info(f"Single pass:     {per_single:.2f} µs per payload ({legacy / single_pass:.1f}x faster)")
+
+if __name__ == '__main__':
+    main()
@@ -1,36 +1,34 @@
-import sqlite3
-import os
+"""
+This script creates the local development database with a test entry.
+It applies the same versioned schema migrations as production, so the test
+entry lands in the `contact` table the app reads from.
+"""
+
 from datetime import datetime
+from sqlalchemy import create_engine, text
 
-# Make sure the app directory exists
-if not os.path.exists('app'):
-    os.makedirs('app')
+from app import get_database_url
+from app.migrations import apply_migrations
 
-# Connect to the SQLite database (will create it if it doesn't exist)
-conn = sqlite3.connect('app/contacts.db')
-cursor = conn.cursor()
+engine = create_engine(get_database_url())
 
-# Create contacts table
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS contacts (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    email TEXT NOT NULL,
-    phone TEXT,
-    company TEXT NOT NULL,
-    message TEXT NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-)
-''')
+# Create the tables
+apply_migrations(engine)
 
 # Create a test entry
-cursor.execute('''
-INSERT INTO contacts (name, email, phone, company, message, created_at)
-VALUES (?, ?, ?, ?, ?, ?)
-''', ('Test User', 'test@example.com', '1234567890', 'Test Company', 'This is a test message', datetime.now().isoformat()))
+with engine.begin() as conn:
+    conn.execute(text('''
+    INSERT INTO contact (name, email, phone, company, message, created_at)
+    VALUES (:name, :email, :phone, :company, :message, :created_at)
+    '''), {
+        'name': 'Test User',
+        'email': 'test@example.com',
+        'phone': '1234567890',
+        'company': 'Test Company',
+        'message': 'This is a test message',
+        'created_at': datetime.utcnow()
+    })
 
-# Commit the transaction and close the connection
-conn.commit()
-conn.close()
+engine.dispose()
 
-print("Database created successfully with test entry!") 
\ No newline at end of file
+print("Database created successfully with test entry!")
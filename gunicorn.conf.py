@@ -0,0 +1,15 @@
+"""
+Gunicorn settings, picked up automatically from the working directory.
+
+Worker count and bind address keep gunicorn's defaults (WEB_CONCURRENCY, PORT),
+so Railway and Procfile deployments behave as before.
+"""
+
+def post_fork(server, worker):
+    """Make sure a worker never shares database connections with the master.
+
+    Only matters when the app is loaded before forking (--preload); otherwise
+    no engine exists yet and this is a no-op.
+    """
+    from app.services.engine_profile import dispose_after_fork
+    dispose_after_fork()
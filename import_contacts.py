@@ -0,0 +1,252 @@
+"""
+Bulk import of contact submissions, e.g. to replay backups after an outage.
+
+Streams records from JSON, JSON Lines or CSV files (optionally gzipped) or
+from a backup journal directory such as app/data, validates them exactly like
+the API does (app.validation), drops duplicates and inserts the rest in
+batches with one multi-row INSERT each.
+
+A record is a duplicate when another record, or a contact already in the
+database, has the same email (case-insensitive), timestamp and message. The
+timestamp is stored as the contact's created_at, so re-running an import
+skips everything it already inserted.
+
+Usage:
+    python import_contacts.py app/data [export.csv ...] [--batch-size 1000]
+        [--workers 4] [--notify] [--dry-run]
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+
+from app.validation import normalize_contacts
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s]: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+def open_input(path):
+    """Open a possibly gzipped input file as text."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+def input_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    return os.path.splitext(name)[1].lstrip('.').lower()
+
+def iter_file(path):
+    """Stream records from one JSON, JSON Lines or CSV file."""
+    fmt = input_format(path)
+    with open_input(path) as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        elif fmt in ('jsonl', 'ndjson'):
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt line {number} in {path}")
+        elif fmt == 'json':
+            # A JSON array has to be parsed whole; use JSON Lines for large inputs
+            data = json.load(f)
+            yield from (data if isinstance(data, list) else [data])
+        else:
+            raise ValueError(f"Unsupported input format: {path}")
+
+def iter_records(paths):
+    """Stream records from every input; directories are read as backup journals."""
+    from app.services.backup_journal import BackupJournal
+
+    for path in paths:
+        if os.path.isdir(path):
+            yield from BackupJournal(path).iter_records()
+        else:
+            yield from iter_file(path)
+
+def parse_timestamp(value):
+    """Parse an ISO timestamp into the naive UTC datetime stored in created_at."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        timestamp = value
+    else:
+        timestamp = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+def validate_chunk(records):
+    """Validate records like the API does; returns (values, error) pairs.
+
+    Runs in worker processes, so it only touches app.validation.
+    """
+    results = []
+    for (values, error), record in zip(normalize_contacts(records), records):
+        if not error:
+            try:
+                values['created_at'] = parse_timestamp(record.get('timestamp') or record.get('created_at'))
+            except (TypeError, ValueError):
+                values, error = None, "Invalid timestamp"
+        results.append((values, error))
+    return results
+
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_validated(records, batch_size, workers):
+    """Yield validated batches in input order, using a process pool if asked."""
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Executor.map submits everything up front; keep the input streaming
+            # by mapping a bounded window of chunks at a time
+            chunks = iter_chunks(records, batch_size)
+            while True:
+                window = list(islice(chunks, workers * 2))
+                if not window:
+                    return
+                yield from executor.map(validate_chunk, window)
+    else:
+        for chunk in iter_chunks(records, batch_size):
+            yield validate_chunk(chunk)
+
+def dedupe_key(values):
+    """Identity of a submission: (email, timestamp, message hash)."""
+    return (
+        values['email'].lower(),
+        values['created_at'],
+        hashlib.sha256(values['message'].encode('utf-8')).digest()
+    )
+
+def existing_keys(keys):
+    """The subset of `keys` already stored in the database."""
+    from sqlalchemy import select
+    from app import db
+    from app.models.contact import Contact
+
+    timestamps = {created_at for _, created_at, _ in keys if created_at is not None}
+    if not timestamps:
+        return set()
+    # ix_contact_created_at narrows this to the rows sharing a timestamp
+    rows = db.session.execute(
+        select(Contact.email, Contact.created_at, Contact.message).where(Contact.created_at.in_(timestamps))
+    )
+    return {
+        key for key in (dedupe_key({'email': email, 'created_at': created_at, 'message': message})
+                        for email, created_at, message in rows)
+        if key in keys
+    }
+
+class ImportStats:
+    """Row counters and throughput for the import report."""
+
+    def __init__(self):
+        self.read = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self.existing = 0
+        self.inserted = 0
+        self.started = time.monotonic()
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.read / elapsed if elapsed > 0 else 0.0
+
+    def report(self, final=False):
+        prefix = "Imported" if final else "Progress:"
+        logger.info(f"{prefix} {self.read} read, {self.inserted} inserted, {self.invalid} invalid, "
+                    f"{self.duplicates} duplicate in input, {self.existing} already stored "
+                    f"({self.rate():,.0f} rows/s)")
+
+def import_contacts(paths, batch_size=1000, workers=1, notify=False, dry_run=False, report_interval=5.0):
+    """Import every record from `paths`; returns the ImportStats."""
+    from app import db
+    from app.services.contact_service import ContactService
+
+    stats = ImportStats()
+    seen = set()
+    last_report = time.monotonic()
+
+    for batch in iter_validated(iter_records(paths), batch_size, workers):
+        stats.read += len(batch)
+
+        rows = {}
+        for values, error in batch:
+            if error:
+                stats.invalid += 1
+                logger.debug(f"Rejected record: {error}")
+                continue
+            key = dedupe_key(values)
+            if key in seen or key in rows:
+                stats.duplicates += 1
+                continue
+            rows[key] = values
+
+        if rows:
+            stored = existing_keys(rows.keys())
+            stats.existing += len(stored)
+            seen.update(rows)
+            new_rows = [values for key, values in rows.items() if key not in stored]
+
+            if dry_run:
+                stats.inserted += len(new_rows)
+            elif new_rows:
+                ContactService.insert_many(new_rows, notify=notify)
+                db.session.commit()
+                stats.inserted += len(new_rows)
+
+        if time.monotonic() - last_report >= report_interval:
+            last_report = time.monotonic()
+            stats.report()
+
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Import contact submissions from backups or exports')
+    parser.add_argument('paths', nargs='+',
+                        help='JSON, JSON Lines or CSV files (optionally .gz), or backup journal directories')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated and inserted per batch')
+    parser.add_argument('--workers', type=int, default=1, help='Processes used for validation')
+    parser.add_argument('--notify', action='store_true', help='Queue notification emails for imported contacts')
+    parser.add_argument('--dry-run', action='store_true', help='Validate and dedupe without inserting')
+    args = parser.parse_args()
+
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        try:
+            stats = import_contacts(args.paths, batch_size=args.batch_size, workers=args.workers,
+                                    notify=args.notify, dry_run=args.dry_run)
+        except Exception as e:
+            logger.error(f"Import failed: {e}")
+            sys.exit(1)
+
+    stats.report(final=True)
+    if args.dry_run:
+        logger.info("Dry run: nothing was written")
+
+if __name__ == '__main__':
+    main()
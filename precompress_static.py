@@ -0,0 +1,91 @@
+"""
+Precompress the built frontend for the static asset layer.
+
+Writes a `.gz` (and, when the `brotli` package is installed, a `.br`) next to
+every compressible file in dist/, at maximum compression since this runs once
+per build rather than per request. A variant is only kept when it is smaller
+than the original. app/services/static_assets.py serves the variants to
+clients that accept them.
+
+Usage:
+    python precompress_static.py [--root dist] [--min-size 1024]
+"""
+
+import argparse
+import gzip
+import logging
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s]: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.html', '.js', '.mjs', '.css', '.json', '.map', '.svg', '.txt', '.xml', '.ico', '.webmanifest'
+}
+
+VARIANT_SUFFIXES = ('.gz', '.br')
+
+def compressors():
+    """(suffix, compress) pairs available in this environment."""
+    available = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        available.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    else:
+        logger.warning("brotli is not installed; writing gzip variants only")
+    return available
+
+def precompress(root, min_size=1024):
+    """Write the compressed variants of the files under `root`; returns (files, saved bytes)."""
+    available = compressors()
+    files = saved = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name.endswith(VARIANT_SUFFIXES) or os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(directory, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+
+            files += 1
+            for suffix, compress in available:
+                compressed = compress(data)
+                variant = path + suffix
+                if len(compressed) >= len(data):
+                    # Not worth serving; drop a stale variant from an earlier build
+                    if os.path.exists(variant):
+                        os.remove(variant)
+                    continue
+                with open(variant, 'wb') as f:
+                    f.write(compressed)
+                saved += len(data) - len(compressed)
+    return files, saved
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompress the built frontend')
+    parser.add_argument('--root', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dist'),
+                        help='Build directory (default: dist/)')
+    parser.add_argument('--min-size', type=int, default=1024, help='Skip files smaller than this many bytes')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        logger.error(f"{args.root} does not exist; run `npm run build` first")
+        sys.exit(1)
+
+    files, saved = precompress(args.root, args.min_size)
+    logger.info(f"Precompressed {files} files in {args.root}, {saved / 1024:.1f} KiB saved across variants")
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,10 @@
 """
 This script sets up the database tables for Thor Signia.
-It uses the Flask app context to create all tables defined in the models.
+It applies the versioned schema migrations to the configured database.
 """
 
 from app import create_app, db
+from app.migrations import apply_migrations
 from app.models.contact import Contact
 import logging
 
@@ -28,8 +29,8 @@ def setup_database():
         # Create all tables within the app context
         with app.app_context():
             # Create tables
-            db.create_all()
-            logger.info("Database tables created successfully!")
+            applied = apply_migrations(db.engine)
+            logger.info(f"Database tables created successfully! Applied migrations: {applied or 'none pending'}")
             
             # Count contact records
             contact_count = Contact.query.count()
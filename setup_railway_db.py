@@ -1,15 +1,18 @@
 """
 This script helps set up the Railway PostgreSQL database for Thor Signia.
-It creates the necessary tables and migrates data from SQLite if needed.
+It applies the schema migrations and migrates data from SQLite if needed.
 """
 
 import os
 import sys
 import argparse
+import io
 import logging
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import psycopg2
-from psycopg2 import sql
 from dotenv import load_dotenv
 
 # Configure logging
@@ -36,159 +39,255 @@ def get_database_url():
     
     return db_url
 
-def connect_to_postgres(db_url):
-    """Connect to the PostgreSQL database."""
+def create_tables(db_url):
+    """Create the tables by applying the versioned schema migrations."""
     try:
-        # Extract connection parameters from the URL
-        connection_params = {}
-        
-        # Parse the connection string
-        if db_url.startswith('postgresql://'):
-            # Remove the protocol part
-            db_url = db_url.replace('postgresql://', '')
-        
-        # Split credentials and host information
-        if '@' in db_url:
-            credentials, host_info = db_url.split('@')
-            if ':' in credentials:
-                connection_params['user'], connection_params['password'] = credentials.split(':')
-            else:
-                connection_params['user'] = credentials
-            
-            # Parse host and database
-            if '/' in host_info:
-                host_port, database = host_info.split('/')
-                connection_params['database'] = database
-                
-                if ':' in host_port:
-                    connection_params['host'], connection_params['port'] = host_port.split(':')
-                else:
-                    connection_params['host'] = host_port
-            else:
-                connection_params['host'] = host_info
-        
-        # Connect to the database
-        connection = psycopg2.connect(**connection_params)
-        connection.autocommit = True
-        
-        logger.info(f"Successfully connected to PostgreSQL database at {connection_params.get('host')}")
-        return connection
+        from app.migrations import upgrade
+        upgrade(db_url)
+        return True
     
     except Exception as e:
-        logger.error(f"Failed to connect to PostgreSQL database: {e}")
-        sys.exit(1)
+        logger.error(f"Failed to apply schema migrations: {e}")
+        return False
 
-def create_contacts_table(conn):
-    """Create the contacts table in PostgreSQL."""
-    try:
-        with conn.cursor() as cursor:
-            # Check if the table already exists
-            cursor.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'contact'
-                );
-            """)
-            table_exists = cursor.fetchone()[0]
-            
-            if table_exists:
-                logger.info("Contacts table already exists in PostgreSQL")
-            else:
-                # Create the contacts table
-                cursor.execute("""
-                    CREATE TABLE contact (
-                        id SERIAL PRIMARY KEY,
-                        name VARCHAR(100) NOT NULL,
-                        email VARCHAR(120) NOT NULL,
-                        phone VARCHAR(20),
-                        company VARCHAR(100) NOT NULL,
-                        message TEXT NOT NULL,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                    );
-                """)
-                logger.info("Successfully created contacts table in PostgreSQL")
-            
-            return True
+CONTACT_COLUMNS = ('name', 'email', 'phone', 'company', 'message', 'created_at')
+
+COPY_CONTACTS = f"COPY contact ({', '.join(CONTACT_COLUMNS)}) FROM STDIN"
+
+CHECKPOINT_TABLE = """
+    CREATE TABLE IF NOT EXISTS sqlite_migration_checkpoint (
+        source TEXT NOT NULL,
+        chunk_start BIGINT NOT NULL,
+        chunk_end BIGINT NOT NULL,
+        row_count INTEGER NOT NULL,
+        migrated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (source, chunk_start)
+    );
+"""
+
+def default_sqlite_path():
+    """The app's local SQLite database, or the legacy app/contacts.db if only that exists."""
+    path = os.path.join('instance', 'contacts.db')
+    legacy_path = os.path.join('app', 'contacts.db')
+    if not os.path.exists(path) and os.path.exists(legacy_path):
+        return legacy_path
+    return path
+
+class MigrationProgress:
+    """Thread-safe row counter that logs progress and throughput periodically."""
     
-    except Exception as e:
-        logger.error(f"Failed to create contacts table: {e}")
-        return False
+    def __init__(self, total, done=0, interval=2.0):
+        self.total = total
+        self.done = done
+        self.copied = 0
+        self.interval = interval
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self._lock = threading.Lock()
+    
+    def add(self, rows):
+        with self._lock:
+            self.done += rows
+            self.copied += rows
+            now = time.monotonic()
+            if now - self._last_report >= self.interval or self.done >= self.total:
+                self._last_report = now
+                self.report(now)
+    
+    def rate(self, now=None):
+        elapsed = (now or time.monotonic()) - self.started
+        return self.copied / elapsed if elapsed > 0 else 0.0
+    
+    def report(self, now=None):
+        rate = self.rate(now)
+        remaining = self.total - self.done
+        eta = f", ETA {remaining / rate:.0f}s" if rate and remaining > 0 else ""
+        percent = self.done * 100 / self.total if self.total else 100
+        logger.info(f"Migrated {self.done}/{self.total} contacts ({percent:.1f}%) at {rate:,.0f} rows/s{eta}")
+
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def copy_value(value):
+    """A value in COPY text format: NULL is \\N, so '' stays an empty string."""
+    if value is None:
+        return '\\N'
+    return str(value).translate(COPY_ESCAPES)
 
-def migrate_data_from_sqlite(pg_conn):
-    """Migrate data from SQLite to PostgreSQL."""
-    sqlite_db_path = os.path.join('app', 'contacts.db')
+def format_copy_chunk(rows):
+    """Render SQLite rows as COPY text-format input."""
+    buffer = io.StringIO()
+    for row in rows:
+        # Rows written before created_at had a default may hold ''
+        buffer.write('\t'.join(map(copy_value, row[:-1] + (row[-1] or None,))))
+        buffer.write('\n')
+    buffer.seek(0)
+    return buffer
+
+def pending_ranges(covered, first_id, end_id, chunk_size):
+    """Id ranges [start, end) within first_id..end_id not covered by checkpoints.
+
+    Gaps are split into chunks of at most chunk_size ids. A chunk that was
+    copied while the source ended inside it only covers up to that end, so
+    rows added to the source later fall into a gap and are copied too.
+    """
+    ranges = []
+    position = first_id
+    for start, end in sorted(covered) + [(end_id, end_id)]:
+        while position < min(start, end_id):
+            chunk_end = min(position + chunk_size, start, end_id)
+            ranges.append((position, chunk_end))
+            position = chunk_end
+        position = max(position, end)
+    return ranges
+
+def copy_chunk(sqlite_conn, pg_conn, source, chunk_start, chunk_end):
+    """Copy contacts with chunk_start <= id < chunk_end and record the chunk, atomically."""
+    rows = sqlite_conn.execute(
+        f"SELECT {', '.join(CONTACT_COLUMNS)} FROM contact WHERE id >= ? AND id < ? ORDER BY id",
+        (chunk_start, chunk_end)
+    ).fetchall()
+    
+    # One transaction per chunk: a chunk is either fully copied and
+    # checkpointed or not at all, so an interrupted run resumes cleanly
+    with pg_conn:
+        with pg_conn.cursor() as cursor:
+            if rows:
+                cursor.copy_expert(COPY_CONTACTS, format_copy_chunk(rows))
+            cursor.execute(
+                """
+                INSERT INTO sqlite_migration_checkpoint (source, chunk_start, chunk_end, row_count)
+                VALUES (%s, %s, %s, %s)
+                """,
+                (source, chunk_start, chunk_end, len(rows))
+            )
+    return len(rows)
+
+def migrate_data_from_sqlite(db_url, sqlite_path=None, chunk_size=10000, workers=1, reset=False):
+    """Migrate data from SQLite to PostgreSQL.
+    
+    Contacts are read in id-range chunks and streamed into PostgreSQL with
+    COPY, so memory stays bounded by one chunk per worker and each chunk
+    costs a couple of round trips. Completed chunks are checkpointed in
+    sqlite_migration_checkpoint; re-running resumes after the last one.
+    
+    COPY assigns new ids and the target has no natural key to dedupe on, so
+    `reset` (copy everything again) is refused while the target still holds
+    contacts that earlier runs copied from this source.
+    """
+    sqlite_db_path = sqlite_path or default_sqlite_path()
     
     if not os.path.exists(sqlite_db_path):
         logger.info("No SQLite database found, skipping migration")
         return True
     
+    source = os.path.realpath(sqlite_db_path)
+    local = threading.local()
+    connections = []
+    connections_lock = threading.Lock()
+    
+    def worker_connections():
+        # SQLite and psycopg2 connections must not be shared between threads
+        if not hasattr(local, 'pg_conn'):
+            local.sqlite_conn = sqlite3.connect(sqlite_db_path, check_same_thread=False)
+            local.pg_conn = psycopg2.connect(db_url)
+            with connections_lock:
+                connections.extend([local.sqlite_conn, local.pg_conn])
+        return local.sqlite_conn, local.pg_conn
+    
     try:
-        # Connect to SQLite database
-        sqlite_conn = sqlite3.connect(sqlite_db_path)
-        sqlite_conn.row_factory = sqlite3.Row
+        sqlite_conn, pg_conn = worker_connections()
         
-        # Get data from SQLite
-        sqlite_cursor = sqlite_conn.cursor()
-        sqlite_cursor.execute("SELECT name, email, phone, company, message, created_at FROM contact")
-        contacts = sqlite_cursor.fetchall()
+        with pg_conn:
+            with pg_conn.cursor() as cursor:
+                cursor.execute(CHECKPOINT_TABLE)
+                if reset:
+                    cursor.execute(
+                        "SELECT COALESCE(SUM(row_count), 0) FROM sqlite_migration_checkpoint WHERE source = %s",
+                        (source,)
+                    )
+                    migrated = cursor.fetchone()[0]
+                    cursor.execute("SELECT EXISTS (SELECT 1 FROM contact)")
+                    if migrated and cursor.fetchone()[0]:
+                        logger.error(f"{migrated} contacts from {sqlite_db_path} were already copied and the "
+                                     f"target still holds contacts; copying again would duplicate them. "
+                                     f"Empty the target's contact table first, or re-run without "
+                                     f"--reset-checkpoint to resume")
+                        return False
+                    cursor.execute("DELETE FROM sqlite_migration_checkpoint WHERE source = %s", (source,))
+                cursor.execute(
+                    "SELECT chunk_start, chunk_end, row_count FROM sqlite_migration_checkpoint WHERE source = %s",
+                    (source,)
+                )
+                checkpoints = cursor.fetchall()
         
-        if not contacts:
+        min_id, max_id, total = sqlite_conn.execute("SELECT MIN(id), MAX(id), COUNT(*) FROM contact").fetchone()
+        if not total:
             logger.info("No data to migrate from SQLite")
-            sqlite_conn.close()
             return True
         
-        # Insert data into PostgreSQL
-        with pg_conn.cursor() as pg_cursor:
-            for contact in contacts:
-                pg_cursor.execute(
-                    """
-                    INSERT INTO contact (name, email, phone, company, message, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    ON CONFLICT DO NOTHING
-                    """,
-                    (
-                        contact['name'],
-                        contact['email'],
-                        contact['phone'],
-                        contact['company'],
-                        contact['message'],
-                        contact['created_at'] or None
-                    )
-                )
+        covered = [(chunk_start, chunk_end) for chunk_start, chunk_end, _ in checkpoints]
+        done = sum(row_count for _, _, row_count in checkpoints)
+        # Checkpoints end at the last id that existed when they were copied
+        pending = pending_ranges(covered, min_id, max_id + 1, chunk_size)
+        if not pending:
+            logger.info(f"All {done} contacts were already migrated from {sqlite_db_path}")
+            return True
+        
+        if covered:
+            logger.info(f"Resuming migration at contact id {pending[0][0]} "
+                        f"({done} contacts already migrated, {len(pending)} chunks left)")
+        
+        progress = MigrationProgress(total, done)
         
-        logger.info(f"Successfully migrated {len(contacts)} contacts from SQLite to PostgreSQL")
-        sqlite_conn.close()
+        def migrate_chunk(chunk):
+            sqlite_conn, pg_conn = worker_connections()
+            progress.add(copy_chunk(sqlite_conn, pg_conn, source, *chunk))
+        
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in [executor.submit(migrate_chunk, chunk) for chunk in pending]:
+                    future.result()
+        else:
+            for chunk in pending:
+                migrate_chunk(chunk)
+        
+        logger.info(f"Successfully migrated {progress.copied} contacts from SQLite to PostgreSQL "
+                    f"in {time.monotonic() - progress.started:.1f}s")
         return True
     
     except Exception as e:
         logger.error(f"Failed to migrate data from SQLite: {e}")
         return False
+    
+    finally:
+        for connection in connections:
+            connection.close()
 
 def main():
     parser = argparse.ArgumentParser(description='Set up Railway PostgreSQL database for Thor Signia')
     parser.add_argument('--database-url', help='PostgreSQL database URL')
     parser.add_argument('--migrate', action='store_true', help='Migrate data from SQLite to PostgreSQL')
+    parser.add_argument('--sqlite-path', help='SQLite database to migrate from (default: instance/contacts.db)')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='Contact ids per COPY chunk')
+    parser.add_argument('--workers', type=int, default=1, help='Chunks copied in parallel')
+    parser.add_argument('--reset-checkpoint', action='store_true',
+                        help='Forget previously migrated chunks and copy everything again; '
+                             'refused while the target still holds contacts copied by earlier runs')
     
     args = parser.parse_args()
     
     # Get database URL from arguments or environment
     db_url = args.database_url or get_database_url()
     
-    # Connect to PostgreSQL
-    conn = connect_to_postgres(db_url)
-    
     # Create tables
-    if create_contacts_table(conn):
+    if create_tables(db_url):
         logger.info("Database setup completed successfully")
     
     # Migrate data if requested
     if args.migrate:
-        if migrate_data_from_sqlite(conn):
+        if migrate_data_from_sqlite(db_url, sqlite_path=args.sqlite_path, chunk_size=args.chunk_size,
+                                    workers=args.workers, reset=args.reset_checkpoint):
             logger.info("Data migration completed successfully")
-    
-    # Close connection
-    conn.close()
-    logger.info("Database connection closed")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
 import { Button } from "@/components/ui/button";
@@ -26,6 +26,48 @@ import {
 // Use a relative API path instead of full URL to avoid CORS issues
 const API_PATH = '/api/contacts';
 
+// Transient failures are retried with the same Idempotency-Key, so the server
+// replays the first response instead of storing the submission twice
+const MAX_ATTEMPTS = 3;
+const RETRY_STATUSES = [502, 503, 504];
+
+const newIdempotencyKey = () =>
+  typeof crypto !== 'undefined' && 'randomUUID' in crypto
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}-${Math.random().toString(36).slice(2)}`;
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+const postContact = async (body: string, idempotencyKey: string) => {
+  for (let attempt = 1; ; attempt++) {
+    try {
+      const response = await fetch(API_PATH, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Accept': 'application/json',
+          'Idempotency-Key': idempotencyKey,
+        },
+        body,
+        // Don't use credentials for cross-origin
+        credentials: 'omit',
+      });
+      // A 409 with Retry-After means the first attempt is still being processed
+      const inProgress = response.status === 409 && response.headers.has('Retry-After');
+      if (attempt < MAX_ATTEMPTS && (inProgress || RETRY_STATUSES.includes(response.status))) {
+        await sleep(500 * attempt);
+        continue;
+      }
+      return response;
+    } catch (networkError) {
+      if (attempt >= MAX_ATTEMPTS) {
+        throw networkError;
+      }
+      await sleep(500 * attempt);
+    }
+  }
+};
+
 const ContactPage = () => {
   const { toast } = useToast();
   const [formData, setFormData] = useState({
@@ -36,10 +78,13 @@ const ContactPage = () => {
     message: '',
   });
   const [isSubmitting, setIsSubmitting] = useState(false);
+  // One key per submission; kept across retries until the form changes
+  const idempotencyKey = useRef<string | null>(null);
   const [openFaq, setOpenFaq] = useState<number | null>(null);
 
   const handleChange = (e: any) => {
     const { name, value } = e.target;
+    idempotencyKey.current = null;
     setFormData(prev => ({ ...prev, [name]: value }));
   };
 
@@ -50,16 +95,10 @@ const ContactPage = () => {
     try {
       console.log(`Submitting form to ${API_PATH}`);
       
-      const response = await fetch(API_PATH, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'Accept': 'application/json',
-        },
-        body: JSON.stringify(formData),
-        // Don't use credentials for cross-origin
-        credentials: 'omit',
-      });
+      if (!idempotencyKey.current) {
+        idempotencyKey.current = newIdempotencyKey();
+      }
+      const response = await postContact(JSON.stringify(formData), idempotencyKey.current);
       
       let data;
       try {
@@ -78,6 +117,7 @@ const ContactPage = () => {
         });
         
         // Reset form
+        idempotencyKey.current = null;
         setFormData({
           name: '',
           email: '',
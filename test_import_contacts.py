@@ -0,0 +1,72 @@
+"""
+This script verifies that replaying a backup journal with import_contacts.py
+into the database it was written from stores nothing twice.
+
+It submits a few contacts through the API against a temporary SQLite
+database, with the backup journal redirected to a temporary directory, then
+imports that journal and checks every record is recognized as already stored.
+"""
+
+import os
+import sys
+import logging
+import tempfile
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s [%(levelname)s]: %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+SUBMISSIONS = [
+    {
+        'name': f'Replay Test {i}',
+        'email': f'Replay{i}@Example.com',
+        'phone': '1234567890',
+        'company': 'Replay & Sons',
+        'message': f'Submission {i} from the journal replay test, with <markup> & "quotes".'
+    }
+    for i in range(3)
+]
+
+def test_journal_replay_inserts_nothing():
+    """Import a journal into its own database and check 0 rows are inserted."""
+    directory = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'contacts.db')}"
+    os.environ.pop('FLASK_ENV', None)
+
+    from app import create_app, db
+    from app.models.contact import Contact
+    from app.services import email_service
+    from app.services.backup_journal import BackupJournal
+    from import_contacts import import_contacts
+
+    journal_dir = os.path.join(directory, 'journal')
+    os.makedirs(journal_dir)
+    email_service._backup_journal = BackupJournal(journal_dir)
+
+    app = create_app()
+    client = app.test_client()
+    for submission in SUBMISSIONS:
+        response = client.post('/api/contacts', json=submission)
+        assert response.status_code == 201, response.get_json()
+        assert response.get_json()['backupCreated'], response.get_json()
+
+    with app.app_context():
+        stats = import_contacts([journal_dir])
+        stored = db.session.query(Contact).count()
+
+    logger.info(f"Replay: {stats.inserted} inserted, {stats.existing} already stored, {stored} rows")
+    assert stats.inserted == 0, f"Replay inserted {stats.inserted} rows"
+    assert stats.existing == len(SUBMISSIONS), f"Only {stats.existing} records matched stored rows"
+    assert stored == len(SUBMISSIONS), f"Table holds {stored} rows"
+
+if __name__ == "__main__":
+    try:
+        test_journal_replay_inserts_nothing()
+    except AssertionError as e:
+        logger.error(e)
+        sys.exit(1)
+    logger.info("Replaying the journal stored nothing twice")
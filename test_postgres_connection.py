@@ -57,9 +57,10 @@ def test_postgresql_connection():
                 db.session.execute(text('SELECT 1'))
                 logger.info("PostgreSQL connection test successful!")
                 
-                # Create tables if they don't exist
-                db.create_all()
-                logger.info("Database tables created or verified")
+                # Tables come from the versioned migrations
+                from app.migrations import check_schema
+                if check_schema(db.engine):
+                    logger.info("Database schema is up to date")
                 
                 # Count existing contact records
                 contact_count = Contact.query.count()
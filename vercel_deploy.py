@@ -52,24 +52,17 @@ def setup_database():
                 logger.info("Falling back to SQLite for this deployment.")
                 return
         
-        # Run the database setup script with the DATABASE_URL
-        from setup_railway_db import connect_to_postgres, create_contacts_table
-        
-        # Connect to PostgreSQL
-        conn = connect_to_postgres(database_url)
-        
-        # Create tables
-        if create_contacts_table(conn):
-            logger.info("Database tables created successfully!")
-        
-        # Close connection
-        conn.close()
+        # Apply pending schema migrations; serverless instances never do
+        from app.migrations import upgrade
+        if database_url.startswith('postgres://'):
+            database_url = database_url.replace('postgres://', 'postgresql://', 1)
+        upgrade(database_url)
         logger.info("Database setup completed.")
         
     except Exception as e:
         logger.error(f"Error setting up database: {e}")
-        # Don't fail the deployment if database setup fails
-        return
+        # Fail the deployment: the new release would run against a stale schema
+        sys.exit(1)
 
 if __name__ == "__main__":
     setup_database() 
\ No newline at end of file
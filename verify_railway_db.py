@@ -129,21 +129,7 @@ def verify_railway_database():
                     logger.info("No contact records found in the database")
             else:
                 logger.warning("Contacts table does not exist in the database")
-                
-                # Create the contacts table
-                logger.info("Creating contacts table...")
-                cursor.execute("""
-                    CREATE TABLE contact (
-                        id SERIAL PRIMARY KEY,
-                        name VARCHAR(100) NOT NULL,
-                        email VARCHAR(120) NOT NULL,
-                        phone VARCHAR(20),
-                        company VARCHAR(100) NOT NULL,
-                        message TEXT NOT NULL,
-                        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                    );
-                """)
-                logger.info("Successfully created contacts table")
+                logger.info("Create it with: python -m app.migrations")
         
         # Close the connection
         conn.close()